@@ -21,62 +21,223 @@ License: BSD 3-Clause
 """
 
 import os
+import re
 import sys
 import json
 import smtplib
+import socket
+import ssl
 import hashlib
 import time
 import base64
+import codecs
 import argparse
+import contextlib
+import copy
+import threading
+import functools
+import importlib.util
+import math
+import types
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
+from email.charset import Charset
 from email.utils import formatdate, make_msgid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import IO, Callable, Iterable, Optional, Dict, List, Mapping, Sequence, Tuple, Union
 from dataclasses import dataclass
 
 try:
     from colorama import init, Fore, Back, Style
-    init(autoreset=True)
 except ImportError:
     print("Please install colorama: pip install colorama")
     sys.exit(1)
 
-# Optional: Google OAuth support
-GOOGLE_OAUTH_AVAILABLE = False
+# Colors only for an interactive, non-dumb terminal, and not when the user
+# opted out with NO_COLOR (https://no-color.org). Decided once here and baked
+# into the prefix constants below. Piped or redirected output skips colorama's
+# stdout wrapper entirely (it would strip the escapes and flush after every
+# write, defeating the block buffering Python already uses for non-TTY
+# streams) and gets blank color codes instead.
+_COLOR = (
+    sys.stdout.isatty()
+    and os.environ.get("TERM") != "dumb"
+    and not os.environ.get("NO_COLOR")
+)
+if _COLOR:
+    init(autoreset=True)
+else:
+    Fore, Back, Style = (
+        types.SimpleNamespace(**dict.fromkeys(vars(codes), ''))
+        for codes in (Fore, Back, Style)
+    )
+
+# Optional: Google OAuth support. The client libraries take a noticeable
+# share of startup, so only their presence is checked here; they are imported
+# by _import_google() the first time an OAuth code path runs.
+GOOGLE_OAUTH_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None
+    for name in ("google_auth_oauthlib", "googleapiclient")
+)
+_GOOGLE_NAMES = ("Request", "Credentials", "InstalledAppFlow", "build", "HttpError", "AuthorizedHttp", "httplib2")
+
+
+def _import_google() -> bool:
+    """Import the Google OAuth/API names into this module on first use.
+
+    Returns False (and clears GOOGLE_OAUTH_AVAILABLE) if they can't be imported;
+    OAuth is optional, password-based auth keeps working.
+    """
+    global GOOGLE_OAUTH_AVAILABLE
+    if not GOOGLE_OAUTH_AVAILABLE:
+        return False
+    if "build" in globals():
+        return True
+    try:
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+        from googleapiclient.errors import HttpError
+    except ImportError:
+        GOOGLE_OAUTH_AVAILABLE = False
+        return False
+    globals().update(
+        Request=Request,
+        Credentials=Credentials,
+        InstalledAppFlow=InstalledAppFlow,
+        build=build,
+        HttpError=HttpError,
+        AuthorizedHttp=AuthorizedHttp,
+        httplib2=httplib2,
+    )
+    return True
+
+
+# Optional: AES-GCM decryption for claim packages. Only claim packages need
+# it, so AESGCM is imported inside decrypt_aes_gcm_packed().
+AES_AVAILABLE = importlib.util.find_spec("cryptography") is not None
+
+# Optional: asyncio SMTP client for the --async send path (otherwise the
+# threaded smtplib path is used). asyncio and aiosmtplib are imported by
+# _import_aiosmtplib() the first time --async sends.
+AIOSMTPLIB_AVAILABLE = importlib.util.find_spec("aiosmtplib") is not None
+_AIOSMTPLIB_NAMES = ("aiosmtplib", "asyncio")
+
+
+def _import_aiosmtplib() -> bool:
+    """Import asyncio and aiosmtplib into this module on first use.
+
+    Returns False (and clears AIOSMTPLIB_AVAILABLE) if aiosmtplib can't be
+    imported.
+    """
+    global AIOSMTPLIB_AVAILABLE
+    if not AIOSMTPLIB_AVAILABLE:
+        return False
+    if "aiosmtplib" in globals():
+        return True
+    try:
+        import asyncio
+        import aiosmtplib
+    except ImportError:
+        AIOSMTPLIB_AVAILABLE = False
+        return False
+    globals().update(asyncio=asyncio, aiosmtplib=aiosmtplib)
+    return True
+
+
+def __getattr__(name):
+    # Module attribute access (e.g. farewell_claimer.build) triggers the lazy import
+    if name in _GOOGLE_NAMES and _import_google():
+        return globals()[name]
+    if name in _AIOSMTPLIB_NAMES and _import_aiosmtplib():
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Optional: SIMD base64 codec for attachments and Gmail API payloads
+PYBASE64_AVAILABLE = False
 try:
-    from google.auth.transport.requests import Request
-    from google.oauth2.credentials import Credentials
-    from google_auth_oauthlib.flow import InstalledAppFlow
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
-    GOOGLE_OAUTH_AVAILABLE = True
+    import pybase64
+    PYBASE64_AVAILABLE = True
 except ImportError:
-    pass  # OAuth is optional, will use password-based auth
+    pass  # stdlib base64 (binascii) is used instead
 
-# Optional: AES-GCM decryption for claim packages
-AES_AVAILABLE = False
+# Optional: orjson for faster message/proof JSON I/O (falls back to stdlib json)
+ORJSON_AVAILABLE = False
 try:
-    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-    AES_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    pass  # AES decryption is optional, only needed for claim packages
+    pass
+
+
+def _json_loads(data: bytes):
+    """Parse JSON from raw bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize ``obj`` as 2-space indented JSON bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits; stdlib json handles them
+    return json.dumps(obj, indent=2).encode('utf-8')
 
 # Ethereum-flavored keccak256 (NOT SHA3-256 — they differ in padding)
 # Required so that publicSignals[0] matches on-chain m.recipientEmailHashes,
 # which the Farewell site computes via ethers.keccak256(toUtf8Bytes(...)).
+# eth_hash is the backend eth_utils.keccak wraps; calling it directly skips
+# eth_utils' per-call argument-type dispatch.
 try:
-    from eth_utils import keccak as _keccak  # type: ignore
+    from eth_hash.auto import keccak as _keccak  # type: ignore
 except ImportError:  # pragma: no cover
-    _keccak = None  # Will fail at proof time with a clear error
+    try:
+        from eth_utils import keccak as _keccak  # type: ignore
+    except ImportError:
+        _keccak = None  # Will fail at proof time with a clear error
+
+
+def _b64encode(data: bytes) -> bytes:
+    """Standard base64, on pybase64 when available."""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode(data)
+    return base64.b64encode(data)
+
+
+def _urlsafe_b64encode(data: bytes) -> bytes:
+    """URL-safe base64 (Gmail API ``raw``), on pybase64 when available."""
+    if PYBASE64_AVAILABLE:
+        return pybase64.urlsafe_b64encode(data)
+    return base64.urlsafe_b64encode(data)
+
+
+def _encode_base64(msg) -> None:
+    """Drop-in for email.encoders.encode_base64 using _b64encode.
+
+    Produces the same 76-column, newline-terminated body as the stdlib
+    encoder (base64.encodebytes), so messages are byte-identical.
+    """
+    encoded = _b64encode(msg.get_payload(decode=True))
+    msg.set_payload(''.join(
+        encoded[i:i + 76].decode('ascii') + '\n' for i in range(0, len(encoded), 76)
+    ))
+    msg['Content-Transfer-Encoding'] = 'base64'
 
 
 def keccak256_hex(data: bytes) -> str:
     """Keccak-256 of bytes, returned as 0x-prefixed hex string.
 
-    Uses eth_utils.keccak if available. This is the same hash the Farewell
+    Uses eth_hash (the eth-utils backend) if available. This is the same hash the Farewell
     site uses for on-chain email commitments (see packages/site/lib/delivery/
     zkemail.ts:computeEmailHash), so proofs produced by the claimer line up
     with the commitments the contract stores.
@@ -90,6 +251,15 @@ def keccak256_hex(data: bytes) -> str:
 
 # ============ Configuration ============
 
+# Send rate limits as (burst capacity, sustained sends per second), enforced
+# by RateLimiter. Each preset carries its own "rate_limit"; Gmail API sends
+# cost 100 of the 250 per-user quota units per second, hence 2.5/s.
+DEFAULT_RATE_LIMIT: Tuple[float, float] = (1, 1.0)
+MANUAL_RATE_LIMIT: Tuple[float, float] = (2, 2.0)
+
+# (True, raw message bytes as sent) or (False, error text)
+SendResult = Tuple[bool, Union[bytes, str]]
+
 @dataclass
 class SMTPConfig:
     """SMTP server configuration."""
@@ -102,6 +272,8 @@ class SMTPConfig:
     display_name: Optional[str] = None
     use_oauth: bool = False
     oauth_credentials: Optional[any] = None
+    gmail_service: Optional[any] = None
+    rate_limit: Tuple[float, float] = DEFAULT_RATE_LIMIT
 
 
 # Gmail OAuth scopes - send permission + metadata for profile access
@@ -112,76 +284,121 @@ GMAIL_SCOPES = [
 CREDENTIALS_FILE = 'credentials.json'
 TOKEN_FILE = 'token.json'
 
+# Refresh the OAuth access token (1h lifetime) when it has less than this
+# left, and keep refreshing on this interval while a long batch is sending.
+OAUTH_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Gmail API batch requests accept up to 100 calls; Google recommends staying
+# at or below 50 to avoid rate-limit errors on the individual sends.
+GMAIL_BATCH_SIZE = 50
+
 # Pre-configured SMTP settings for popular providers
-SMTP_PRESETS: Dict[str, Dict] = {
-    "gmail_oauth": {
-        "host": "gmail-api",
-        "port": 0,
-        "use_tls": False,
-        "use_ssl": False,
-        "use_oauth": True,
-        "note": "Uses OAuth 2.0 - no password required! Opens browser for authorization.",
-        "help_url": "https://console.cloud.google.com/"
-    },
-    "gmail": {
-        "host": "smtp.gmail.com",
-        "port": 587,
-        "use_tls": True,
-        "use_ssl": False,
-        "note": "Requires an App Password (enable 2FA first)",
-        "help_url": "https://support.google.com/accounts/answer/185833"
-    },
-    "outlook": {
-        "host": "smtp-mail.outlook.com",
-        "port": 587,
-        "use_tls": True,
-        "use_ssl": False,
-        "note": "Use your regular Outlook/Hotmail credentials",
-        "help_url": "https://support.microsoft.com/en-us/office/pop-imap-and-smtp-settings-for-outlook-com"
-    },
-    "yahoo": {
-        "host": "smtp.mail.yahoo.com",
-        "port": 587,
-        "use_tls": True,
-        "use_ssl": False,
-        "note": "Generate an App Password in Yahoo Account settings",
-        "help_url": "https://help.yahoo.com/kb/generate-third-party-passwords-sln15241.html"
-    },
-    "icloud": {
-        "host": "smtp.mail.me.com",
-        "port": 587,
-        "use_tls": True,
-        "use_ssl": False,
-        "note": "Generate an app-specific password at appleid.apple.com",
-        "help_url": "https://support.apple.com/en-us/HT204397"
-    },
-    "zoho": {
-        "host": "smtp.zoho.com",
-        "port": 587,
-        "use_tls": True,
-        "use_ssl": False,
-        "note": "Use your Zoho Mail credentials",
-        "help_url": "https://www.zoho.com/mail/help/zoho-smtp.html"
-    },
-    "protonmail": {
-        "host": "smtp.protonmail.ch",
-        "port": 587,
-        "use_tls": True,
-        "use_ssl": False,
-        "note": "Requires ProtonMail Bridge - not fully supported yet",
-        "help_url": "https://protonmail.com/bridge/"
-    }
-}
+@dataclass(frozen=True)
+class SMTPPreset:
+    """Connection settings for a known email provider (see SMTP_PRESETS)."""
+    host: str
+    port: int
+    use_tls: bool
+    use_ssl: bool
+    note: str = ""
+    help_url: str = ""
+    use_oauth: bool = False
+    rate_limit: Tuple[float, float] = DEFAULT_RATE_LIMIT
+
+
+# Read-only view: presets are shared process-wide and must not be mutated
+SMTP_PRESETS: Mapping[str, SMTPPreset] = types.MappingProxyType({
+    "gmail_oauth": SMTPPreset(
+        host="gmail-api",
+        port=0,
+        use_tls=False,
+        use_ssl=False,
+        use_oauth=True,
+        note="Uses OAuth 2.0 - no password required! Opens browser for authorization.",
+        help_url="https://console.cloud.google.com/",
+        rate_limit=(10, 2.5),
+    ),
+    "gmail": SMTPPreset(
+        host="smtp.gmail.com",
+        port=587,
+        use_tls=True,
+        use_ssl=False,
+        note="Requires an App Password (enable 2FA first)",
+        help_url="https://support.google.com/accounts/answer/185833",
+        rate_limit=(1, 1.0),
+    ),
+    "outlook": SMTPPreset(
+        host="smtp-mail.outlook.com",
+        port=587,
+        use_tls=True,
+        use_ssl=False,
+        note="Use your regular Outlook/Hotmail credentials",
+        help_url="https://support.microsoft.com/en-us/office/pop-imap-and-smtp-settings-for-outlook-com",
+        rate_limit=(1, 0.5),
+    ),
+    "yahoo": SMTPPreset(
+        host="smtp.mail.yahoo.com",
+        port=587,
+        use_tls=True,
+        use_ssl=False,
+        note="Generate an App Password in Yahoo Account settings",
+        help_url="https://help.yahoo.com/kb/generate-third-party-passwords-sln15241.html",
+        rate_limit=(1, 1.0),
+    ),
+    "icloud": SMTPPreset(
+        host="smtp.mail.me.com",
+        port=587,
+        use_tls=True,
+        use_ssl=False,
+        note="Generate an app-specific password at appleid.apple.com",
+        help_url="https://support.apple.com/en-us/HT204397",
+        rate_limit=(1, 1.0),
+    ),
+    "zoho": SMTPPreset(
+        host="smtp.zoho.com",
+        port=587,
+        use_tls=True,
+        use_ssl=False,
+        note="Use your Zoho Mail credentials",
+        help_url="https://www.zoho.com/mail/help/zoho-smtp.html",
+        rate_limit=(1, 1.0),
+    ),
+    "protonmail": SMTPPreset(
+        host="smtp.protonmail.ch",
+        port=587,
+        use_tls=True,
+        use_ssl=False,
+        note="Requires ProtonMail Bridge - not fully supported yet",
+        help_url="https://protonmail.com/bridge/",
+        rate_limit=(1, 1.0),
+    ),
+})
 
 # ============ UI Helpers ============
 
-def clear_screen():
-    """Clear terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+# Color prefixes for the print helpers, resolved once (blank unless _COLOR)
+_OK = Fore.GREEN
+_ERR = Fore.RED
+_WARN = Fore.YELLOW
+_INFO = Fore.BLUE
+_CY = Fore.CYAN
+_WHITE = Fore.WHITE
+_RESET = Style.RESET_ALL
+
+# Complete per-severity line prefixes, keyed by level, and the shared line ending
+_LEVELS = {
+    "success": f"{_OK}✓ ",
+    "error": f"{_ERR}✗ ",
+    "warning": f"{_WARN}⚠ ",
+    "info": f"{_INFO}ℹ ",
+}
+_LINE_END = f"{_RESET}\n"
+# The same pieces pre-encoded for the terminal descriptor path
+_LEVEL_BYTES = {level: prefix.encode('utf-8') for level, prefix in _LEVELS.items()}
+_LINE_END_BYTES = _LINE_END.encode('utf-8')
 
-def print_banner():
-    """Print the Farewell banner with logo."""
-    banner = f"""
+# The banner never changes, so it is formatted once at import
+_BANNER = f"""
 {Fore.CYAN}                        ╭──────╮
                     ╭───╯      ╰───╮
                 ╭───╯      {Fore.WHITE}│{Fore.CYAN}       ╰───╮
@@ -202,71 +419,295 @@ def print_banner():
                 ╰───╮              ╭───╯
                     ╰───╮      ╭───╯
                         ╰──────╯
-{Style.RESET_ALL}"""
-    print(banner)
+{Style.RESET_ALL}
+"""
+
+def _stdout_fd() -> Optional[int]:
+    """File descriptor behind sys.stdout, if UTF-8 bytes can be written to it directly.
+
+    None on Windows (colorama has to translate the escapes), for non-UTF-8
+    streams, and for streams without a real descriptor (e.g. StringIO).
+    """
+    if os.name == 'nt':
+        return None
+    stream = sys.stdout
+    try:
+        if codecs.lookup(stream.encoding).name != 'utf-8':
+            return None
+        fd = stream.fileno()
+    except (AttributeError, TypeError, LookupError, OSError, ValueError):
+        return None
+    return fd if isinstance(fd, int) else None
+
+def _write_all(fd: int, data: bytes) -> None:
+    """os.write ``data`` to ``fd``, looping over short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+# A terminal stdout is written with os.write on its descriptor, skipping the
+# TextIOWrapper (and colorama's wrapper around it). Resolved once at import;
+# any other stream, including one swapped in later, goes through .write().
+_TTY_FD = _stdout_fd() if sys.stdout.isatty() else None
+_TTY_STREAM = sys.stdout if _TTY_FD is not None else None
+
+def _emit(text: str) -> None:
+    """Write ``text`` to stdout in one call.
+
+    ``print()`` issues separate writes for the message and for ``end``, and
+    colorama's wrapper flushes after each; the helpers below build the whole
+    line and hand it over at once. stdout is looked up per call so redirected
+    (or test-patched) streams are honored; only the original terminal stream
+    takes the os.write path.
+    """
+    stream = sys.stdout
+    if stream is _TTY_STREAM:
+        _write_tty(text.encode('utf-8'))
+    else:
+        stream.write(text)
+
+def _write_tty(data: bytes) -> None:
+    """os.write encoded output to the terminal, after any buffered print() text.
+
+    Unlocked: all console output comes from the main thread (the send,
+    .eml writer and prover pools never print).
+    """
+    _TTY_STREAM.flush()
+    _write_all(_TTY_FD, data)
+
+_CLEAR_SEQ = "\033[2J\033[H"  # erase display, cursor home
+
+def clear_screen():
+    """Clear terminal screen.
+
+    ANSI terminals (colorama translates on Windows) get the escape sequence
+    directly; anything else falls back to spawning cls/clear.
+    """
+    if _COLOR:
+        _emit(_CLEAR_SEQ)
+        sys.stdout.flush()
+        return
+    sys.stdout.flush()  # buffered text must reach the stream before the child's output
+    os.system('cls' if os.name == 'nt' else 'clear')
+
+_BANNER_BYTES = _BANNER.encode('utf-8')
+
+def print_banner():
+    """Print the Farewell banner with logo.
+
+    The banner is pre-encoded, so on a UTF-8 descriptor it goes out as one
+    os.write with no TextIOWrapper encoding.
+    """
+    fd = _stdout_fd()
+    if fd is None:
+        _emit(_BANNER)
+        return
+    sys.stdout.flush()  # keep anything already buffered ahead of the banner
+    _write_all(fd, _BANNER_BYTES)
+
+# Section header around the title, built once like the banner
+_RULE = '─' * 60
+_SECTION_HEAD = f"\n{_CY}{_RULE}\n{_CY}  "
+_SECTION_TAIL = f"\n{_CY}{_RULE}{_RESET}\n\n"
 
 def print_section(title: str):
     """Print a section header."""
-    print(f"\n{Fore.CYAN}{'─' * 60}")
-    print(f"{Fore.CYAN}  {title}")
-    print(f"{Fore.CYAN}{'─' * 60}{Style.RESET_ALL}\n")
+    _emit(_SECTION_HEAD + title + _SECTION_TAIL)
+
+# All status output goes through the level table. The line pieces are frozen
+# into default arguments, so a call does fast local loads instead of
+# module-global lookups. sys.stdout is still resolved per call, so
+# redirection keeps working; the terminal gets the pre-encoded pieces and
+# only the message itself is encoded.
+def _print_level(level: str, msg: str, _l=_LEVELS, _e=_LINE_END,
+                 _lb=_LEVEL_BYTES, _eb=_LINE_END_BYTES):
+    """Print one status message of the given level."""
+    stream = sys.stdout
+    if stream is _TTY_STREAM:
+        _write_tty(_lb[level] + msg.encode('utf-8') + _eb)
+    else:
+        stream.write(_l[level] + msg + _e)
+
+def print_many(level: str, messages: Iterable[str], _w=_emit, _l=_LEVELS, _e=_LINE_END):
+    """Print several status messages of one level ("success", "error",
+    "warning" or "info") as a single write."""
+    prefix = _l[level]
+    _w("".join([prefix + msg + _e for msg in messages]))
 
 def print_success(msg: str):
     """Print success message."""
-    print(f"{Fore.GREEN}✓ {msg}{Style.RESET_ALL}")
+    _print_level("success", msg)
 
 def print_error(msg: str):
     """Print error message."""
-    print(f"{Fore.RED}✗ {msg}{Style.RESET_ALL}")
+    _print_level("error", msg)
 
 def print_warning(msg: str):
     """Print warning message."""
-    print(f"{Fore.YELLOW}⚠ {msg}{Style.RESET_ALL}")
+    _print_level("warning", msg)
 
 def print_info(msg: str):
     """Print info message."""
-    print(f"{Fore.BLUE}ℹ {msg}{Style.RESET_ALL}")
+    _print_level("info", msg)
+
+def print_info_many(messages: Iterable[str]):
+    """Print several info messages at once."""
+    print_many("info", messages)
+
+def print_success_many(messages: Iterable[str]):
+    """Print several success messages at once."""
+    print_many("success", messages)
+
+@functools.lru_cache(maxsize=64)
+def _format_prompt(msg: str, default: str) -> str:
+    """Colored prompt text; retry loops re-ask with the same arguments."""
+    if default:
+        return f"{_WHITE}{msg} [{_CY}{default}{_WHITE}]: {_RESET}"
+    return f"{_WHITE}{msg}: {_RESET}"
 
 def prompt(msg: str, default: str = "") -> str:
     """Prompt user for input."""
-    if default:
-        result = input(f"{Fore.WHITE}{msg} [{Fore.CYAN}{default}{Fore.WHITE}]: {Style.RESET_ALL}")
-        return result if result else default
-    return input(f"{Fore.WHITE}{msg}: {Style.RESET_ALL}")
+    # input() only goes through readline when stdin and stdout are both
+    # terminals; piped input is already a plain write + flush + readline.
+    result = input(_format_prompt(msg, default))
+    return result if result else default
 
 def prompt_password(msg: str) -> str:
     """Prompt user for password (hidden input)."""
     import getpass
-    return getpass.getpass(f"{Fore.WHITE}{msg}: {Style.RESET_ALL}")
+    return getpass.getpass(f"{_WHITE}{msg}: {_RESET}")
 
-def select_option(options: List[str], title: str = "Select an option:") -> int:
-    """Display numbered options and return selected index."""
-    print(f"{Fore.WHITE}{title}{Style.RESET_ALL}")
-    for i, opt in enumerate(options, 1):
-        print(f"  {Fore.CYAN}{i}.{Style.RESET_ALL} {opt}")
+_OPTION_LINE = f"  {_CY}%d.{_RESET} %s\n"  # colors baked in once; filled per option
+_MENU_CHUNK = 256  # options rendered per write, bounding memory for long menus
 
+def select_option(options: Sequence[str], title: str = "Select an option:") -> int:
+    """Display numbered options and return selected index."""
+    # The menu is rendered once (in one write unless it is very long); a
+    # retry only prints the error
+    count = len(options)
+    head = f"{_WHITE}{title}{_RESET}\n"
+    for start in range(0, count or 1, _MENU_CHUNK):
+        chunk = options[start:start + _MENU_CHUNK]
+        _emit(head + "".join([_OPTION_LINE % item for item in enumerate(chunk, start + 1)]))
+        head = ""
+
+    # Loop invariants: the accepted choices and the out-of-range message
+    valid = range(1, count + 1)
+    out_of_range = f"Please enter a number between 1 and {count}"
     while True:
-        try:
-            choice = int(prompt("Enter your choice"))
-            if 1 <= choice <= len(options):
-                return choice - 1
-            print_error(f"Please enter a number between 1 and {len(options)}")
-        except ValueError:
+        # isdecimal() guarantees int() succeeds, so bad input never raises
+        raw = prompt("Enter your choice").strip()
+        if not raw.isdecimal():
             print_error("Please enter a valid number")
+            continue
+        choice = int(raw)
+        if choice in valid:
+            return choice - 1
+        print_error(out_of_range)
+
+_YES = frozenset({'y', 'yes'})
 
 def confirm(msg: str, default: bool = True) -> bool:
-    """Ask for confirmation."""
+    """Ask for confirmation. Anything but an empty answer or y/yes means no."""
     suffix = "[Y/n]" if default else "[y/N]"
-    result = prompt(f"{msg} {suffix}").lower()
+    result = prompt(f"{msg} {suffix}").strip().lower()
     if not result:
         return default
-    return result in ('y', 'yes')
+    return result in _YES
+
+# ============ Rate Limiting ============
+
+# Attempts per message when the server throttles us or drops the session
+MAX_SEND_ATTEMPTS = 3
+
+# Upper bound on concurrent SMTP sessions per batch
+SMTP_MAX_WORKERS = 8
+
+# Concurrent aiosmtplib sessions used by send_emails_async (--async)
+ASYNC_SMTP_CLIENTS = 4
+
+# main_flow builds, sends and proves recipients this many at a time, so a
+# large batch never holds every sent message in memory at once
+SEND_WINDOW = 200
+
+class RateLimiter:
+    """Token bucket: bursts of up to ``capacity`` sends, refilled at ``refill_per_sec``.
+
+    Thread-safe. ``acquire()`` blocks until a token is available; ``backoff()``
+    halves the refill rate after the provider reports throttling.
+    """
+
+    MIN_REFILL_PER_SEC = 0.1
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.refill_per_sec)
+        self._last = now
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return -self._tokens / self.refill_per_sec if self._tokens < 0 else 0.0
+
+    def acquire(self):
+        """Take one token, sleeping until the bucket has refilled enough."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def slow_down(self, retry_after: Optional[float] = None) -> float:
+        """Halve the refill rate and return how long to pause (Retry-After if given)."""
+        with self._lock:
+            self.refill_per_sec = max(self.MIN_REFILL_PER_SEC, self.refill_per_sec / 2)
+            self._tokens = 0.0
+            self._last = time.monotonic()
+            return retry_after if retry_after is not None else 1 / self.refill_per_sec
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """Slow down after a rate-limit response, honoring Retry-After if given."""
+        time.sleep(self.slow_down(retry_after))
+
+
+def is_throttle_error(exc: Exception) -> bool:
+    """Whether an SMTP or Gmail API error means "slow down and retry"."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return any(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if "aiosmtplib" in globals():  # only imported once an --async send ran
+        if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+            return any(400 <= r.code < 500 for r in exc.recipients)
+        if isinstance(exc, aiosmtplib.SMTPResponseException):
+            return 400 <= exc.code < 500
+    status = getattr(getattr(exc, 'resp', None), 'status', None)
+    if status == 429:
+        return True
+    return status == 403 and 'rate' in str(exc).lower()
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Retry-After seconds from a Gmail API error response, if present."""
+    resp = getattr(exc, 'resp', None)
+    try:
+        return float(resp.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
 
 # ============ Gmail OAuth ============
 
 def setup_gmail_oauth() -> Optional[SMTPConfig]:
     """Setup Gmail with OAuth 2.0 authentication."""
-    if not GOOGLE_OAUTH_AVAILABLE:
+    if not _import_google():
         print_error("Google OAuth libraries not installed!")
         print_info("Install with: pip install google-auth-oauthlib google-api-python-client")
         return None
@@ -274,12 +715,14 @@ def setup_gmail_oauth() -> Optional[SMTPConfig]:
     # Check for credentials.json
     if not Path(CREDENTIALS_FILE).exists():
         print_error(f"'{CREDENTIALS_FILE}' not found!")
-        print_info("To set up Gmail OAuth:")
-        print_info("  1. Go to https://console.cloud.google.com/")
-        print_info("  2. Create a project (or select existing)")
-        print_info("  3. Enable the Gmail API")
-        print_info("  4. Create OAuth 2.0 credentials (Desktop app)")
-        print_info(f"  5. Download and save as '{CREDENTIALS_FILE}' in this directory")
+        print_info_many((
+            "To set up Gmail OAuth:",
+            "  1. Go to https://console.cloud.google.com/",
+            "  2. Create a project (or select existing)",
+            "  3. Enable the Gmail API",
+            "  4. Create OAuth 2.0 credentials (Desktop app)",
+            f"  5. Download and save as '{CREDENTIALS_FILE}' in this directory",
+        ))
         return None
 
     creds = None
@@ -303,8 +746,10 @@ def setup_gmail_oauth() -> Optional[SMTPConfig]:
                 creds = None
 
         if not creds:
-            print_info("Opening browser for Google authorization...")
-            print_info("Please sign in and grant permission to send emails.")
+            print_info_many((
+                "Opening browser for Google authorization...",
+                "Please sign in and grant permission to send emails.",
+            ))
             print()
 
             try:
@@ -316,15 +761,14 @@ def setup_gmail_oauth() -> Optional[SMTPConfig]:
 
         # Save the token for future use
         try:
-            with open(TOKEN_FILE, 'w') as token:
-                token.write(creds.to_json())
+            save_oauth_token(creds)
             print_success(f"Token saved to '{TOKEN_FILE}' for future use.")
         except Exception as e:
             print_warning(f"Could not save token: {e}")
 
     # Get the user's email address
     try:
-        service = build('gmail', 'v1', credentials=creds)
+        service = _build_gmail_service(creds)
         profile = service.users().getProfile(userId='me').execute()
         email = profile['emailAddress']
         print_success(f"Authenticated as: {email}")
@@ -343,40 +787,182 @@ def setup_gmail_oauth() -> Optional[SMTPConfig]:
         password="",
         display_name=display_name,
         use_oauth=True,
-        oauth_credentials=creds
+        oauth_credentials=creds,
+        gmail_service=service,
+        rate_limit=SMTP_PRESETS["gmail_oauth"].rate_limit
     )
 
 
-def send_email_gmail_api(config: SMTPConfig, email_msg: MIMEMultipart, recipient: str) -> Tuple[bool, str]:
+def save_oauth_token(creds) -> None:
+    """Persist OAuth credentials to TOKEN_FILE for future runs."""
+    with open(TOKEN_FILE, 'w') as token:
+        token.write(creds.to_json())
+
+
+def refresh_oauth_token_if_needed(config: SMTPConfig, margin: timedelta = OAUTH_REFRESH_MARGIN) -> bool:
+    """Refresh the OAuth access token if it expires within ``margin``.
+
+    Doing this ahead of the send loop keeps the refresh round trip off the
+    path of any individual send. The refreshed token is written back to
+    TOKEN_FILE. Returns True if a refresh happened.
+    """
+    creds = config.oauth_credentials
+    if creds is None or not getattr(creds, 'refresh_token', None):
+        return False
+
+    # Credentials without an expiry never report as expired; refreshing them
+    # before every send window would only cost extra token requests.
+    if creds.expiry is None:
+        return False
+    # google-auth stores expiry as a naive UTC datetime; an already expired
+    # token is inside the margin too
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if creds.expiry - now > margin:
+        return False
+
+    _import_google()
+    creds.refresh(Request())
+    try:
+        save_oauth_token(creds)
+    except Exception as e:
+        print_warning(f"Could not save token: {e}")
+    return True
+
+
+def refresh_oauth_before_window(config: SMTPConfig, window_size: int) -> None:
+    """Refresh the OAuth token on the main thread ahead of a send window.
+
+    Gmail API sends run on this thread too, so the credentials are never
+    read and refreshed concurrently. The margin adds the window's expected
+    duration at the provider's rate, so the token outlives the window. A
+    failed refresh is reported; the sends then surface any real auth error.
+    """
+    margin = OAUTH_REFRESH_MARGIN + timedelta(seconds=window_size / config.rate_limit[1])
+    try:
+        if refresh_oauth_token_if_needed(config, margin):
+            print_info("Refreshed OAuth token before sending.")
+    except Exception as e:
+        print_warning(f"Could not refresh OAuth token: {e}")
+
+
+def _build_gmail_service(creds):
+    """Build a Gmail API service over a single keep-alive HTTP transport.
+
+    Every request and batch made through the service goes out on this one
+    AuthorizedHttp, so consecutive sends reuse the TLS connection to
+    gmail.googleapis.com instead of handshaking again.
+    """
+    _import_google()
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=30))
+    return build('gmail', 'v1', http=http, cache_discovery=False)
+
+
+def get_gmail_service(config: SMTPConfig):
+    """Return the Gmail API service for this config, building it on first use.
+
+    ``build()`` parses the discovery document and constructs the whole
+    resource tree, so the result is cached on the config and shared by every
+    later call (which also lets the underlying HTTP connection be reused).
+    """
+    if config.gmail_service is None:
+        config.gmail_service = _build_gmail_service(config.oauth_credentials)
+    return config.gmail_service
+
+
+def send_email_gmail_api(config: SMTPConfig, email_msg: MIMEMultipart, recipient: str) -> SendResult:
     """Send email using Gmail API (OAuth)."""
-    if not GOOGLE_OAUTH_AVAILABLE:
+    if not _import_google():
         return False, "Google OAuth libraries not installed"
 
     try:
-        service = build('gmail', 'v1', credentials=config.oauth_credentials)
-
-        # Get raw message
-        raw_msg = email_msg.as_string()
+        service = get_gmail_service(config)
 
-        # Encode for Gmail API
-        encoded_message = base64.urlsafe_b64encode(raw_msg.encode('utf-8')).decode('utf-8')
+        # Flatten straight to bytes and encode for Gmail API
+        raw_bytes = email_msg.as_bytes()
+        encoded_message = _urlsafe_b64encode(raw_bytes).decode('ascii')
 
         # Send via Gmail API
         message = {'raw': encoded_message}
         service.users().messages().send(userId='me', body=message).execute()
 
-        return True, raw_msg
+        return True, raw_bytes
     except HttpError as e:
         return False, f"Gmail API error: {e}"
     except Exception as e:
         return False, str(e)
 
 
+def send_emails_gmail_batch(
+    config: SMTPConfig,
+    messages: List[Tuple[MIMEMultipart, str]],
+    limiter: Optional[RateLimiter] = None,
+) -> List[SendResult]:
+    """Send many emails through Gmail API batch requests.
+
+    Each batch carries up to GMAIL_BATCH_SIZE ``messages.send`` calls in a
+    single HTTP round trip, paced by ``limiter``. Sends rejected for rate
+    limiting are retried in a later batch after backing off. Returns one
+    (success, raw_message_bytes_or_error) per input message, in order.
+    """
+    if not _import_google():
+        return [(False, "Google OAuth libraries not installed")] * len(messages)
+
+    try:
+        service = get_gmail_service(config)
+    except Exception as e:
+        return [(False, str(e))] * len(messages)
+
+    if limiter is None:
+        limiter = RateLimiter(*config.rate_limit)
+
+    raw_msgs = [email_msg.as_bytes() for email_msg, _ in messages]
+    results: List[Optional[SendResult]] = [None] * len(messages)
+    pending = list(range(len(messages)))
+
+    for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+        throttled: List[int] = []
+        retry_after: List[Optional[float]] = [None]
+
+        def _on_response(request_id, response, exception):
+            i = int(request_id)
+            if exception is None:
+                results[i] = (True, raw_msgs[i])
+            elif attempt < MAX_SEND_ATTEMPTS and is_throttle_error(exception):
+                throttled.append(i)
+                retry_after[0] = _retry_after(exception) or retry_after[0]
+            else:
+                results[i] = (False, f"Gmail API error: {exception}")
+
+        for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+            chunk = pending[start:start + GMAIL_BATCH_SIZE]
+            batch = service.new_batch_http_request(callback=_on_response)
+            for i in chunk:
+                limiter.acquire()
+                encoded_message = _urlsafe_b64encode(raw_msgs[i]).decode('ascii')
+                batch.add(
+                    service.users().messages().send(userId='me', body={'raw': encoded_message}),
+                    request_id=str(i),
+                )
+            try:
+                batch.execute()
+            except Exception as e:
+                for i in chunk:
+                    if results[i] is None and i not in throttled:
+                        results[i] = (False, str(e))
+
+        if not throttled:
+            break
+        limiter.backoff(retry_after[0])
+        pending = sorted(throttled)
+
+    return [r if r is not None else (False, "No response from Gmail API") for r in results]
+
+
 def test_gmail_oauth_connection(config: SMTPConfig) -> bool:
     """Test Gmail OAuth connection by checking profile."""
     print_info("Testing Gmail OAuth connection...")
     try:
-        service = build('gmail', 'v1', credentials=config.oauth_credentials)
+        service = get_gmail_service(config)
         profile = service.users().getProfile(userId='me').execute()
         print_success(f"Gmail OAuth connection successful! ({profile['emailAddress']})")
         return True
@@ -387,11 +973,13 @@ def test_gmail_oauth_connection(config: SMTPConfig) -> bool:
 
 # ============ SMTP Configuration ============
 
-def setup_smtp() -> Optional[SMTPConfig]:
-    """Interactive SMTP setup."""
-    print_section("SMTP Configuration")
+@functools.lru_cache(maxsize=None)
+def _provider_menu() -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Return the (provider keys, styled menu labels) for setup_smtp.
 
-    # Build provider list dynamically
+    Built once per process: OAuth availability and credentials.json presence
+    are checked on first use and the styled labels reused on every retry.
+    """
     providers = []
     provider_names = []
 
@@ -417,6 +1005,14 @@ def setup_smtp() -> Optional[SMTPConfig]:
         f"{Fore.RED}Manual Configuration{Style.RESET_ALL} (custom SMTP server)"
     ])
 
+    return tuple(providers), tuple(provider_names)
+
+def setup_smtp() -> Optional[SMTPConfig]:
+    """Interactive SMTP setup."""
+    print_section("SMTP Configuration")
+
+    providers, provider_names = _provider_menu()
+
     choice = select_option(provider_names, "Select your email provider:")
     provider = providers[choice]
 
@@ -430,12 +1026,11 @@ def setup_smtp() -> Optional[SMTPConfig]:
     preset = SMTP_PRESETS[provider]
 
     print()
-    print_info(f"Selected: {provider.upper()}")
-    print_info(f"Server: {preset['host']}:{preset['port']}")
-    if preset.get('note'):
-        print_warning(preset['note'])
-        if preset.get('help_url'):
-            print_info(f"Help: {preset['help_url']}")
+    print_info_many((f"Selected: {provider.upper()}", f"Server: {preset.host}:{preset.port}"))
+    if preset.note:
+        print_warning(preset.note)
+        if preset.help_url:
+            print_info(f"Help: {preset.help_url}")
     print()
 
     email = prompt("Your email address")
@@ -443,13 +1038,14 @@ def setup_smtp() -> Optional[SMTPConfig]:
     display_name = prompt("Display name (optional)", email.split('@')[0])
 
     return SMTPConfig(
-        host=preset['host'],
-        port=preset['port'],
-        use_tls=preset['use_tls'],
-        use_ssl=preset['use_ssl'],
+        host=preset.host,
+        port=preset.port,
+        use_tls=preset.use_tls,
+        use_ssl=preset.use_ssl,
         email=email,
         password=password,
-        display_name=display_name
+        display_name=display_name,
+        rate_limit=preset.rate_limit
     )
 
 def setup_smtp_manual() -> SMTPConfig:
@@ -471,7 +1067,8 @@ def setup_smtp_manual() -> SMTPConfig:
         use_ssl=use_ssl,
         email=email,
         password=password,
-        display_name=display_name
+        display_name=display_name,
+        rate_limit=MANUAL_RATE_LIMIT
     )
 
 def test_smtp_connection(config: SMTPConfig) -> bool:
@@ -482,19 +1079,8 @@ def test_smtp_connection(config: SMTPConfig) -> bool:
 
     print_info("Testing SMTP connection...")
     try:
-        if config.use_ssl:
-            server = smtplib.SMTP_SSL(config.host, config.port, timeout=30)
-        else:
-            server = smtplib.SMTP(config.host, config.port, timeout=30)
-
-        server.ehlo()
-
-        if config.use_tls and not config.use_ssl:
-            server.starttls()
-            server.ehlo()
-
-        server.login(config.email, config.password)
-        server.quit()
+        with smtp_session(config):
+            pass
 
         print_success("SMTP connection successful!")
         return True
@@ -508,22 +1094,8 @@ def test_smtp_connection(config: SMTPConfig) -> bool:
 
 # ============ Email Sending ============
 
-def create_farewell_email(
-    sender_email: str,
-    sender_name: str,
-    recipient_email: str,
-    subject: str,
-    message_body: str,
-    content_hash: str,
-    attachment_json: Optional[str] = None,
-    attachment_filename: Optional[str] = None
-) -> MIMEMultipart:
-    """Create an email with Farewell-Hash embedded and optional JSON attachment."""
-    # Build the text body parts (plain + HTML) as an alternative sub-message
-    body_alt = MIMEMultipart('alternative')
-
-    # Body with Farewell-Hash
-    body_with_hash = f"""{message_body}
+# Body templates, filled in with str.format_map by _render_bodies
+_PLAIN_TEMPLATE = """{message_body}
 
 ---
 Farewell-Hash: {content_hash}
@@ -539,18 +1111,13 @@ along with your off-chain secret (s') at: https://farewell.world/decrypt/
 Or use the command-line tool: https://github.com/farewell-world/farewell-decrypter
 """
 
-    # Plain text version
-    text_part = MIMEText(body_with_hash, 'plain', 'utf-8')
-    body_alt.attach(text_part)
-
-    # HTML version
-    html_body = f"""
+_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head><meta charset="utf-8"></head>
 <body style="font-family: Arial, sans-serif; padding: 20px;">
     <div style="max-width: 600px; margin: 0 auto;">
-        {message_body.replace(chr(10), '<br>')}
+        {message_body_html}
 
         <hr style="margin: 30px 0; border: none; border-top: 1px solid #ddd;">
 
@@ -577,17 +1144,87 @@ Or use the command-line tool: https://github.com/farewell-world/farewell-decrypt
 </body>
 </html>
 """
-    html_part = MIMEText(html_body, 'html', 'utf-8')
+
+@functools.lru_cache(maxsize=32)
+def _render_bodies(message_body: str, content_hash: str) -> Tuple[str, str]:
+    """Render the (plain, html) body text for a message and hash.
+
+    Memoized, so repeated create_farewell_email() calls for the same message
+    only format the templates once.
+    """
+    plain = _PLAIN_TEMPLATE.format_map({
+        "message_body": message_body,
+        "content_hash": content_hash,
+    })
+    html_body = _HTML_TEMPLATE.format_map({
+        "message_body_html": message_body.replace('\n', '<br>'),
+        "content_hash": content_hash,
+    })
+    return plain, html_body
+
+def build_body_parts(message_body: str, content_hash: str) -> Tuple[MIMEText, MIMEText]:
+    """Build the plain-text and HTML body parts carrying the Farewell-Hash.
+
+    The parts depend only on the message and hash, so a batch builds them
+    once and shares them across every recipient's envelope.
+    """
+    plain, html_body = _render_bodies(message_body, content_hash)
+    return _text_part(plain, 'plain'), _text_part(html_body, 'html')
+
+SMTP_MAX_LINE = 998  # RFC 5322 line limit, excluding CRLF
+
+_UTF8_8BIT = Charset('utf-8')
+_UTF8_8BIT.body_encoding = None  # MIMEText then labels the part 8bit
+
+def _text_part(text: str, subtype: str) -> MIMEText:
+    """Build a text part whose raw body keeps the Farewell-Hash line intact.
+
+    The prover reads the DKIM-signed body bytes as they are (soft line
+    breaks are not removed), so the 81-character hash line must never be
+    wrapped. Quoted-printable would wrap it at 76 columns; instead ASCII
+    text with short lines goes out as 7bit, other text with short lines as
+    8bit UTF-8, and base64 is kept only for lines too long for SMTP. A
+    server without 8BITMIME gets the 8bit parts as base64 (see _wire_bytes).
+    """
+    if all(len(line) <= SMTP_MAX_LINE for line in text.encode('utf-8').splitlines()):
+        if text.isascii():
+            return MIMEText(text, subtype, 'us-ascii')
+        return MIMEText(text, subtype, _UTF8_8BIT)
+    return MIMEText(text, subtype, 'utf-8')
+
+def build_attachment_part(attachment_json: Union[str, bytes], attachment_filename: Optional[str] = None) -> MIMEApplication:
+    """Build the claim package JSON attachment (from text or the file's raw bytes)."""
+    if isinstance(attachment_json, str):
+        attachment_json = attachment_json.encode('utf-8')
+    att = MIMEApplication(attachment_json, _subtype='json', _encoder=_encode_base64)
+    fname = attachment_filename or 'farewell-claim-package.json'
+    att.add_header('Content-Disposition', 'attachment', filename=fname)
+    return att
+
+def wrap_envelope(
+    text_part: MIMEText,
+    html_part: MIMEText,
+    sender_email: str,
+    sender_name: str,
+    recipient_email: str,
+    subject: str,
+    attachment_part: Optional[MIMEApplication] = None
+) -> MIMEMultipart:
+    """Wrap prebuilt body parts in a per-recipient message with headers.
+
+    Attaching only appends to the new container's payload, so the same parts
+    can be wrapped for any number of recipients.
+    """
+    # Build the text body parts (plain + HTML) as an alternative sub-message
+    body_alt = MIMEMultipart('alternative')
+    body_alt.attach(text_part)
     body_alt.attach(html_part)
 
     # If there's an attachment, wrap in mixed; otherwise just use the alternative
-    if attachment_json:
+    if attachment_part is not None:
         msg = MIMEMultipart('mixed')
         msg.attach(body_alt)
-        att = MIMEApplication(attachment_json.encode('utf-8'), _subtype='json')
-        fname = attachment_filename or 'farewell-claim-package.json'
-        att.add_header('Content-Disposition', 'attachment', filename=fname)
-        msg.attach(att)
+        msg.attach(attachment_part)
     else:
         msg = body_alt
 
@@ -600,42 +1237,373 @@ Or use the command-line tool: https://github.com/farewell-world/farewell-decrypt
 
     return msg
 
-def send_email(config: SMTPConfig, email_msg: MIMEMultipart, recipient: str) -> Tuple[bool, str]:
-    """Send an email and return (success, raw_message)."""
-    # Use Gmail API if OAuth is configured
-    if config.use_oauth:
-        return send_email_gmail_api(config, email_msg, recipient)
+def create_farewell_email(
+    sender_email: str,
+    sender_name: str,
+    recipient_email: str,
+    subject: str,
+    message_body: str,
+    content_hash: str,
+    attachment_json: Optional[str] = None,
+    attachment_filename: Optional[str] = None
+) -> MIMEMultipart:
+    """Create an email with Farewell-Hash embedded and optional JSON attachment."""
+    text_part, html_part = build_body_parts(message_body, content_hash)
+    attachment_part = (
+        build_attachment_part(attachment_json, attachment_filename) if attachment_json else None
+    )
+    return wrap_envelope(
+        text_part, html_part, sender_email, sender_name, recipient_email, subject, attachment_part
+    )
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context() -> ssl.SSLContext:
+    """Default client TLS context, built (and the CA bundle loaded) once per process."""
+    return ssl.create_default_context()
 
+def _set_nodelay(server: smtplib.SMTP) -> None:
+    """Disable Nagle on the session socket; SMTP is many small command/reply turns."""
     try:
-        if config.use_ssl:
-            server = smtplib.SMTP_SSL(config.host, config.port, timeout=30)
-        else:
-            server = smtplib.SMTP(config.host, config.port, timeout=30)
+        server.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except (AttributeError, OSError):
+        pass  # Not a TCP socket (or already closed); nothing to tune
 
+def open_smtp(config: SMTPConfig) -> smtplib.SMTP:
+    """Open an authenticated SMTP session (connect, EHLO, STARTTLS, LOGIN).
+
+    The caller owns the returned connection and must ``quit()`` it.
+    """
+    if config.use_ssl:
+        server = smtplib.SMTP_SSL(config.host, config.port, timeout=30, context=_ssl_context())
+    else:
+        server = smtplib.SMTP(config.host, config.port, timeout=30)
+
+    try:
+        _set_nodelay(server)
         server.ehlo()
 
         if config.use_tls and not config.use_ssl:
-            server.starttls()
+            server.starttls(context=_ssl_context())
             server.ehlo()
 
         server.login(config.email, config.password)
+    except Exception:
+        server.close()
+        raise
+
+    return server
 
-        raw_msg = email_msg.as_string()
-        server.sendmail(config.email, recipient, raw_msg)
-        server.quit()
+@contextlib.contextmanager
+def smtp_session(config: SMTPConfig):
+    """``with`` wrapper around open_smtp(): QUIT on success, just close on error."""
+    server = open_smtp(config)
+    try:
+        yield server
+    except BaseException:
+        server.close()
+        raise
+    server.quit()
+
+def flatten_for_smtp(email_msg: MIMEMultipart) -> bytes:
+    """Serialize a message to the CRLF bytes that go over the wire.
+
+    as_bytes() runs a BytesGenerator (mangle_from_=False) with the message's
+    own policy, producing the same bytes smtplib.send_message would send.
+    """
+    return email_msg.as_bytes(policy=email_msg.policy.clone(linesep='\r\n'))
+
+def _base64_text_parts(email_msg: MIMEMultipart) -> MIMEMultipart:
+    """Copy of ``email_msg`` with its 8bit text parts re-encoded as base64.
+
+    The text parts are shared by every recipient's envelope, so they are
+    copied rather than changed in place.
+    """
+    email_msg = copy.deepcopy(email_msg)
+    for part in email_msg.walk():
+        if part.get('Content-Transfer-Encoding') == '8bit':
+            text = part.get_payload(decode=True).decode(part.get_content_charset())
+            del part['Content-Transfer-Encoding']
+            part.set_payload(text, 'utf-8')
+    return email_msg
+
+def _wire_bytes(email_msg: MIMEMultipart, has_extension: Callable[[str], bool]) -> Tuple[bytes, List[str]]:
+    """Flatten ``email_msg`` for one SMTP session: (bytes for DATA, MAIL FROM options).
+
+    An 8bit body is declared with BODY=8BITMIME when the server offers it
+    (RFC 6152). Otherwise its 8bit parts go out as base64 instead, so only
+    7bit data reaches DATA. ``has_extension`` is the session's EHLO lookup
+    (smtplib's has_extn or aiosmtplib's supports_extension); it is only
+    consulted for 8bit bodies.
+    """
+    raw_bytes = flatten_for_smtp(email_msg)
+    if raw_bytes.isascii():
+        return raw_bytes, []
+    if has_extension('8bitmime'):
+        return raw_bytes, ['BODY=8BITMIME']
+    return flatten_for_smtp(_base64_text_parts(email_msg)), []
+
+def send_on(server: smtplib.SMTP, config: SMTPConfig, email_msg: MIMEMultipart, recipient: str) -> bytes:
+    """Send one email over an already-authenticated session and return the raw bytes sent.
+
+    The message is flattened to CRLF bytes once and sent with a bare
+    MAIL/RCPT/DATA transaction (no per-send EHLO); the same bytes become the
+    .eml copy. RSET is only issued to clear a failed transaction.
+    """
+    raw_bytes, options = _wire_bytes(email_msg, server.has_extn)
+    if not (config.email + recipient).isascii():
+        # Internationalized addresses need SMTPUTF8 on MAIL FROM; sendmail
+        # refuses it if the server lacks the extension and resets on failure.
+        # The same flattened bytes are sent, so the .eml matches the wire.
+        server.sendmail(config.email, [recipient], raw_bytes, mail_options=['SMTPUTF8', *options])
+        return raw_bytes
+
+    try:
+        code, resp = server.mail(config.email, options or [])
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, resp, config.email)
+        code, resp = server.rcpt(recipient)
+        if code not in (250, 251):
+            raise smtplib.SMTPRecipientsRefused({recipient: (code, resp)})
+        code, resp = server.data(raw_bytes)
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+    except smtplib.SMTPServerDisconnected:
+        raise
+    except Exception:
+        try:
+            server.rset()
+        except smtplib.SMTPException:
+            pass
+        raise
+    return raw_bytes
+
+def send_email(config: SMTPConfig, email_msg: MIMEMultipart, recipient: str) -> SendResult:
+    """Send an email and return (success, raw_message_bytes) or (False, error)."""
+    # Use Gmail API if OAuth is configured
+    if config.use_oauth:
+        return send_email_gmail_api(config, email_msg, recipient)
+
+    try:
+        with smtp_session(config) as server:
+            raw_msg = send_on(server, config, email_msg, recipient)
 
         return True, raw_msg
     except Exception as e:
         return False, str(e)
 
-def save_eml(raw_message: str, filename: str, output_dir: str = "proofs") -> str:
-    """Save email as .eml file."""
-    Path(output_dir).mkdir(exist_ok=True)
-    filepath = Path(output_dir) / filename
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(raw_message)
+def _send_smtp_with_retries(
+    config: SMTPConfig,
+    email_msg: MIMEMultipart,
+    recipient: str,
+    limiter: RateLimiter,
+    session: types.SimpleNamespace,
+) -> SendResult:
+    """Send one message on ``session.server``, (re)connecting it as needed.
+
+    Dropped sessions are reopened on the next attempt; temporary (4xx)
+    rejections back off the limiter first. Gives up after MAX_SEND_ATTEMPTS.
+    """
+    for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+        limiter.acquire()
+        try:
+            if session.server is None:
+                session.server = open_smtp(config)
+            return True, send_on(session.server, config, email_msg, recipient)
+        except smtplib.SMTPServerDisconnected as e:
+            # Reconnect lazily on the next attempt
+            session.server = None
+            if attempt == MAX_SEND_ATTEMPTS:
+                return False, str(e)
+        except Exception as e:
+            if attempt < MAX_SEND_ATTEMPTS and is_throttle_error(e):
+                limiter.backoff()
+                continue
+            return False, str(e)
+    return False, "Send failed"
+
+def send_emails(
+    config: SMTPConfig,
+    messages: List[Tuple[MIMEMultipart, str]],
+    limiter: Optional[RateLimiter] = None,
+) -> List[SendResult]:
+    """Send a batch of (email_msg, recipient) pairs, one (success, raw_message) per pair.
+
+    SMTP sends run on up to SMTP_MAX_WORKERS threads, capped by the limiter's
+    burst capacity. Each worker keeps one authenticated session for all of its
+    messages instead of paying TCP + TLS + EHLO + AUTH per recipient, and every
+    send draws from the shared rate limiter. Gmail OAuth batches go out as
+    Gmail API batch requests.
+    """
+    if limiter is None:
+        limiter = RateLimiter(*config.rate_limit)
+
+    if config.use_oauth:
+        return send_emails_gmail_batch(config, messages, limiter)
+
+    if not messages:
+        return []
+
+    workers = max(1, min(SMTP_MAX_WORKERS, len(messages), math.ceil(limiter.capacity)))
+    local = threading.local()
+    sessions: List[types.SimpleNamespace] = []
+    sessions_lock = threading.Lock()
+
+    def _worker_session() -> types.SimpleNamespace:
+        if not hasattr(local, 'session'):
+            local.session = types.SimpleNamespace(server=None)
+            with sessions_lock:
+                sessions.append(local.session)
+        return local.session
+
+    def _send(item: Tuple[MIMEMultipart, str]) -> SendResult:
+        email_msg, recipient = item
+        return _send_smtp_with_retries(config, email_msg, recipient, limiter, _worker_session())
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp-send") as pool:
+            return list(pool.map(_send, messages))
+    finally:
+        for session in sessions:
+            if session.server is not None:
+                try:
+                    session.server.quit()
+                except Exception:
+                    pass
+
+async def _open_async_smtp(config: SMTPConfig) -> "aiosmtplib.SMTP":
+    """Async counterpart of open_smtp(): connect (EHLO/STARTTLS) and LOGIN.
+
+    asyncio already sets TCP_NODELAY on its TCP transports.
+    """
+    client = aiosmtplib.SMTP(
+        hostname=config.host,
+        port=config.port,
+        use_tls=config.use_ssl,
+        start_tls=config.use_tls and not config.use_ssl,
+        timeout=30,
+        tls_context=_ssl_context(),
+    )
+    await client.connect()
+    try:
+        await client.login(config.email, config.password)
+    except Exception:
+        client.close()
+        raise
+    return client
+
+async def _send_all_async(
+    config: SMTPConfig,
+    messages: List[Tuple[MIMEMultipart, str]],
+    limiter: RateLimiter,
+) -> List[SendResult]:
+    """Send ``messages`` over up to ASYNC_SMTP_CLIENTS sessions on one event loop.
+
+    Messages are dealt round-robin to the sessions; each session sends its
+    share sequentially, reconnecting when dropped and backing off the shared
+    limiter on temporary (4xx) rejections, like _send_smtp_with_retries.
+    """
+    results: List[SendResult] = [(False, "Send failed")] * len(messages)
+    clients = max(1, min(ASYNC_SMTP_CLIENTS, len(messages), math.ceil(limiter.capacity)))
+
+    async def _client_loop(first: int):
+        client = None
+        try:
+            for i in range(first, len(messages), clients):
+                email_msg, recipient = messages[i]
+                for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+                    await asyncio.sleep(limiter.reserve())
+                    try:
+                        if client is None:
+                            client = await _open_async_smtp(config)
+                        raw_bytes, options = _wire_bytes(email_msg, client.supports_extension)
+                        if not (config.email + recipient).isascii():
+                            # As in send_on: mailboxes are only sent as UTF-8 with SMTPUTF8
+                            options = ['SMTPUTF8', *options]
+                        await client.sendmail(config.email, [recipient], raw_bytes, mail_options=options)
+                        results[i] = (True, raw_bytes)
+                        break
+                    except aiosmtplib.SMTPServerDisconnected as e:
+                        # Reconnect lazily on the next attempt
+                        client = None
+                        results[i] = (False, str(e))
+                    except Exception as e:
+                        results[i] = (False, str(e))
+                        if attempt < MAX_SEND_ATTEMPTS and is_throttle_error(e):
+                            await asyncio.sleep(limiter.slow_down())
+                            continue
+                        break
+        finally:
+            if client is not None:
+                try:
+                    await client.quit()
+                except Exception:
+                    pass
+
+    await asyncio.gather(*(_client_loop(k) for k in range(clients)))
+    return results
+
+def send_emails_async(
+    config: SMTPConfig,
+    messages: List[Tuple[MIMEMultipart, str]],
+    limiter: Optional[RateLimiter] = None,
+) -> List[SendResult]:
+    """Like send_emails(), but multiplexes SMTP sessions on an asyncio event loop.
+
+    Uses aiosmtplib when installed; otherwise (and for Gmail OAuth, which
+    goes through the Gmail API) falls back to send_emails().
+    """
+    if config.use_oauth or not _import_aiosmtplib():
+        return send_emails(config, messages, limiter)
+
+    if not messages:
+        return []
+
+    if limiter is None:
+        limiter = RateLimiter(*config.rate_limit)
+
+    return asyncio.run(_send_all_async(config, messages, limiter))
+
+def _write_private_file(filepath: Path, data: bytes) -> None:
+    """Write ``data`` to ``filepath`` in one unbuffered pass, mode 0600.
+
+    Proof artifacts contain message content, so they are created readable by
+    the owner only.
+    """
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+@functools.lru_cache(maxsize=8)
+def _ensure_output_dir(output_dir: str) -> Path:
+    """Create ``output_dir`` once per process and return it as a Path.
+
+    A batch saves one .eml and one proof per recipient into the same
+    directory, so only the first save pays for the mkdir.
+    """
+    path = Path(output_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _save_artifact(output_dir: str, filename: str, data: bytes) -> str:
+    """Write ``data`` to ``output_dir/filename`` and return the path."""
+    filepath = _ensure_output_dir(output_dir) / filename
+    try:
+        _write_private_file(filepath, data)
+    except FileNotFoundError:
+        # The directory went away after it was cached; recreate it once.
+        _ensure_output_dir.cache_clear()
+        _ensure_output_dir(output_dir)
+        _write_private_file(filepath, data)
     return str(filepath)
 
+def save_eml(raw_message: Union[str, bytes], filename: str, output_dir: str = "proofs") -> str:
+    """Save email as .eml file (bytes are written exactly as sent)."""
+    if isinstance(raw_message, str):
+        raw_message = raw_message.encode('utf-8')
+    return _save_artifact(output_dir, filename, raw_message)
+
 # ============ Proof Generation ============
 
 # DKIM public-key Poseidon hashes — PoseidonLarge(121,17) of the RSA modulus,
@@ -656,42 +1624,35 @@ KNOWN_DKIM_PUBKEY_HASHES: Dict[Tuple[str, str], str] = {
 ZERO_HASH_HEX = "0x" + "0" * 64
 
 
-def extract_dkim_domain_and_selector(eml_content: str) -> Tuple[Optional[str], Optional[str]]:
+# Compiled once and run over bytes so the header scan skips str decoding.
+# The header pattern takes the DKIM-Signature line plus its folded
+# continuation lines; the tag patterns mirror zkemail.ts.
+_DKIM_RE = re.compile(rb'^DKIM-Signature:([^\r\n]*(?:\r?\n[ \t][^\r\n]*)*)', re.IGNORECASE | re.MULTILINE)
+_DKIM_FOLD_RE = re.compile(rb'\s*\r?\n\s*')
+_DKIM_D_RE = re.compile(rb'\bd=([^;\s]+)')
+_DKIM_S_RE = re.compile(rb'\bs=([^;\s]+)')
+
+
+def extract_dkim_domain_and_selector(eml_content: Union[str, bytes]) -> Tuple[Optional[str], Optional[str]]:
     """Pull the DKIM-Signature d= (domain) and s= (selector) tags out of an .eml.
 
     Returns (domain, selector). Either may be None if the header is missing.
     Matches the site's ``extractDkimPubkeyHash`` parsing in zkemail.ts.
     """
-    import re
+    if isinstance(eml_content, str):
+        eml_content = eml_content.encode('utf-8', errors='replace')
 
-    # DKIM-Signature headers span multiple folded lines. Reassemble.
-    lines = eml_content.splitlines()
-    header_lines: List[str] = []
-    capturing = False
-    for line in lines:
-        if not line:
-            if capturing:
-                break
-            continue
-        if line.startswith(" ") or line.startswith("\t"):
-            if capturing:
-                header_lines.append(line.strip())
-            continue
-        if capturing:
-            break
-        if line.lower().startswith("dkim-signature:"):
-            header_lines.append(line.split(":", 1)[1].strip())
-            capturing = True
-
-    if not header_lines:
+    header = _DKIM_RE.search(eml_content)
+    if not header:
         return None, None
 
-    dkim_header = " ".join(header_lines)
-    d_match = re.search(r"\bd=([^;\s]+)", dkim_header)
-    s_match = re.search(r"\bs=([^;\s]+)", dkim_header)
+    # DKIM-Signature headers span multiple folded lines. Unfold.
+    dkim_header = _DKIM_FOLD_RE.sub(b' ', header.group(1))
+    d_match = _DKIM_D_RE.search(dkim_header)
+    s_match = _DKIM_S_RE.search(dkim_header)
     return (
-        d_match.group(1).lower() if d_match else None,
-        s_match.group(1) if s_match else None,
+        d_match.group(1).decode('utf-8', errors='replace').lower() if d_match else None,
+        s_match.group(1).decode('utf-8', errors='replace') if s_match else None,
     )
 
 
@@ -709,6 +1670,17 @@ def compute_dkim_pubkey_hash(domain: Optional[str], selector: Optional[str]) ->
     return ZERO_HASH_HEX
 
 
+@functools.lru_cache(maxsize=4)
+def _dkim_signal(headers: str) -> Tuple[Optional[str], Optional[str], str]:
+    """Return (domain, selector, pubkey hash) for an .eml header block.
+
+    Memoized so the CLI's DKIM summary and generate_proof_data share one
+    parse of each recipient's headers.
+    """
+    domain, selector = extract_dkim_domain_and_selector(headers)
+    return domain, selector, compute_dkim_pubkey_hash(domain, selector)
+
+
 def run_external_prover(
     prover_cmd: str,
     eml_content: str,
@@ -760,9 +1732,102 @@ def run_external_prover(
     return result
 
 
-def generate_proof_data(eml_content: str, recipient_email: str, content_hash: str) -> Dict:
+def _prover_jobs() -> int:
+    """Number of proofs to generate at once.
+
+    Standalone proofs are a couple of cached lookups, so one worker is
+    enough. The external prover is a separate process per recipient and
+    runs FAREWELL_PROVER_JOBS at a time (default: CPU count, at most 4).
+    """
+    if not os.environ.get("FAREWELL_PROVER_CMD", "").strip():
+        return 1
+    try:
+        jobs = int(os.environ.get("FAREWELL_PROVER_JOBS", ""))
+    except ValueError:
+        jobs = min(4, os.cpu_count() or 1)
+    return max(1, jobs)
+
+
+_ASCII_LOWER = bytes.maketrans(bytes(range(0x41, 0x5B)), bytes(range(0x61, 0x7B)))
+
+
+def _normalized_email_bytes(recipient_email: str) -> bytes:
+    """UTF-8 bytes of ``recipient_email.strip().lower()``.
+
+    ASCII addresses (nearly all of them) are lowercased with a byte translate
+    table; anything else falls back to full Unicode ``str.lower()``.
+    """
+    email = recipient_email.strip()
+    try:
+        return email.encode('ascii').translate(_ASCII_LOWER)
+    except UnicodeEncodeError:
+        return email.lower().encode('utf-8')
+
+
+@functools.lru_cache(maxsize=1024)
+def _recipient_hash(recipient_email: str) -> str:
+    """keccak256 of the normalized recipient address (publicSignals[0]).
+
+    Memoized so repeated recipients and re-runs skip the hash entirely.
+    """
+    return keccak256_hex(_normalized_email_bytes(recipient_email))
+
+
+EML_READ_CHUNK = 64 * 1024
+_HEADER_END = re.compile(rb'\r?\n\r?\n')
+
+EmlSource = Union[str, bytes, os.PathLike, IO[bytes]]
+
+
+def _eml_headers(eml_source: EmlSource) -> str:
+    """Return only the header block of an .eml, reading files in EML_READ_CHUNK blocks.
+
+    ``str`` and ``bytes`` are message content; a path or binary file is read
+    just far enough to find the blank line that ends the headers, so large
+    bodies are never loaded.
+    """
+    if isinstance(eml_source, str):
+        end = re.search(r'\r?\n\r?\n', eml_source)
+        return eml_source[:end.start()] if end else eml_source
+    if isinstance(eml_source, bytes):
+        head = eml_source
+    else:
+        fp = open(eml_source, 'rb') if isinstance(eml_source, os.PathLike) else eml_source
+        try:
+            head = b''
+            for chunk in iter(lambda: fp.read(EML_READ_CHUNK), b''):
+                # Re-scan the last few bytes in case the separator straddles chunks
+                start = max(0, len(head) - 3)
+                head += chunk
+                if _HEADER_END.search(head, start):
+                    break
+        finally:
+            if fp is not eml_source:
+                fp.close()
+    end = _HEADER_END.search(head)
+    return (head[:end.start()] if end else head).decode('utf-8', 'replace')
+
+
+def _eml_text(eml_source: EmlSource) -> str:
+    """Return the whole .eml as text, whatever form it was given in."""
+    if isinstance(eml_source, str):
+        return eml_source
+    if isinstance(eml_source, os.PathLike):
+        data = Path(eml_source).read_bytes()
+    elif isinstance(eml_source, bytes):
+        data = eml_source
+    else:
+        data = eml_source.read()
+    return data if isinstance(data, str) else data.decode('utf-8', 'replace')
+
+
+def generate_proof_data(eml_content: EmlSource, recipient_email: str, content_hash: str) -> Dict:
     """Generate the Groth16 delivery proof that Farewell.proveDelivery expects.
 
+    ``eml_content`` is the sent message as ``str``/``bytes`` content, a path,
+    or a binary file. Standalone proofs only need the DKIM-Signature header,
+    so only the header block is read; the external prover gets the full .eml.
+
     Public signals (see farewell-core/docs/proof-structure.md):
       [0] recipient email commitment — Poseidon(PackBytes(recipient)), matching
           the circuit and the site's on-chain commitment
@@ -775,18 +1840,21 @@ def generate_proof_data(eml_content: str, recipient_email: str, content_hash: st
     In standalone mode, publicSignals use placeholder hashes and Groth16 points
     are zeros — the proof will not pass on-chain verification.
     """
-    recipient_normalized = recipient_email.lower().strip()
-    recipient_hash = keccak256_hex(recipient_normalized.encode())
+    recipient_hash = _recipient_hash(recipient_email)
+
+    prover_cmd = os.environ.get("FAREWELL_PROVER_CMD", "").strip()
+    if prover_cmd:
+        eml_content = _eml_text(eml_content)
+    headers = _eml_headers(eml_content)
 
-    dkim_domain, dkim_selector = extract_dkim_domain_and_selector(eml_content)
-    dkim_pubkey_hash = compute_dkim_pubkey_hash(dkim_domain, dkim_selector)
+    _, _, dkim_pubkey_hash = _dkim_signal(headers)
 
     public_signals = [recipient_hash, dkim_pubkey_hash, content_hash]
 
-    prover_cmd = os.environ.get("FAREWELL_PROVER_CMD", "").strip()
     if prover_cmd:
         external = run_external_prover(
-            prover_cmd, eml_content, recipient_normalized, content_hash, public_signals
+            prover_cmd, eml_content, _normalized_email_bytes(recipient_email).decode('utf-8'),
+            content_hash, public_signals
         )
         return {
             "pA": external["pA"],
@@ -886,11 +1954,56 @@ def validate_delivery_proof(proof: Dict) -> Tuple[bool, str]:
 
 def save_proof(proof: Dict, filename: str, output_dir: str = "proofs") -> str:
     """Save proof as JSON file."""
-    Path(output_dir).mkdir(exist_ok=True)
-    filepath = Path(output_dir) / filename
-    with open(filepath, 'w') as f:
-        json.dump(proof, f, indent=2)
-    return str(filepath)
+    return _save_artifact(output_dir, filename, _json_dumps(proof))
+
+# ============ Recipients ============
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def normalize_recipients(raw) -> Tuple[List[str], List[List[int]]]:
+    """Lowercase, validate and dedupe a recipient list before sending.
+
+    ``raw`` may be a list or a comma-separated string. Returns the cleaned
+    recipients together with every position each one has in ``raw``, so
+    proofs keep the recipientIndex of the original on-chain recipients[]
+    array. A repeated address is mailed once, but the claim needs a proof
+    for each of its indices, so none of them is dropped.
+    """
+    if isinstance(raw, str):
+        raw = raw.split(',')
+
+    recipients, indices = [], []
+    seen: Dict[str, List[int]] = {}
+    for index, entry in enumerate(raw):
+        email = str(entry).strip().lower()
+        if not email:
+            continue
+        if not EMAIL_RE.match(email):
+            print_warning(f"Skipping invalid recipient: {email}")
+            continue
+        if email in seen:
+            print_warning(f"Duplicate recipient {email}: sending once, proof reused for index {index}")
+            seen[email].append(index)
+            continue
+        seen[email] = [index]
+        recipients.append(email)
+        indices.append(seen[email])
+    return recipients, indices
+
+
+def normalize_content_hash(value) -> str:
+    """Return the payload content hash as ``0x`` followed by 64 hex digits.
+
+    The ``0x`` prefix is optional on input. Raises ValueError unless the
+    digits decode to exactly 32 bytes; ``bytes.fromhex`` does the hex check.
+    """
+    value = str(value).strip()
+    digits = value[2:] if value[:2] in ('0x', '0X') else value
+    if len(digits) != 64 or len(bytes.fromhex(digits)) != 32:
+        raise ValueError(f"content hash must be 32 bytes of hex, got {value!r}")
+    return '0x' + digits
+
 
 # ============ AES-GCM Decryption (for claim packages) ============
 
@@ -936,6 +2049,8 @@ def decrypt_aes_gcm_packed(encrypted_hex: str, sk_share_str: str, s_prime_str: s
     iv = data[:12]
     ciphertext_and_tag = data[12:]
 
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
     try:
         aesgcm = AESGCM(key)
         plaintext = aesgcm.decrypt(iv, ciphertext_and_tag, None)
@@ -946,13 +2061,16 @@ def decrypt_aes_gcm_packed(encrypted_hex: str, sk_share_str: str, s_prime_str: s
         return None
 
 
-def _load_claim_package(data: Dict, filepath: str) -> Optional[Dict]:
+def _load_claim_package(data: Dict, filepath: str, raw: Optional[bytes] = None) -> Optional[Dict]:
     """
     Handle the claim package format from Farewell UI (type: farewell-claim-package).
 
     The claimer does not decrypt the message — only the recipient can do that
     using their off-chain secret (s'). The claimer just needs the recipients,
     content hash, and subject to send the email and generate proofs.
+
+    ``raw`` is the exported file's bytes; when given it is attached to the
+    email as-is instead of re-serializing ``data``.
     """
     # Validate required fields
     required = ['recipients', 'contentHash']
@@ -961,13 +2079,13 @@ def _load_claim_package(data: Dict, filepath: str) -> Optional[Dict]:
             print_error(f"Claim package missing '{field}' field")
             return None
 
-    recipients = data['recipients']
-    if isinstance(recipients, str):
-        recipients = [r.strip() for r in recipients.split(',') if r.strip()]
+    recipients, recipient_indices = normalize_recipients(data['recipients'])
 
-    content_hash = data['contentHash']
-    if not content_hash.startswith('0x'):
-        content_hash = '0x' + content_hash
+    try:
+        content_hash = normalize_content_hash(data['contentHash'])
+    except ValueError:
+        print_error("Claim package 'contentHash' must be 0x followed by 64 hex characters")
+        return None
 
     owner = data.get('owner', 'someone')
     crypto_scheme = data.get('cryptoScheme', '')
@@ -1000,20 +2118,23 @@ def _load_claim_package(data: Dict, filepath: str) -> Optional[Dict]:
 
     result = {
         "recipients": recipients,
+        "recipient_indices": recipient_indices,
         "content_hash": content_hash,
         "message": message,
         "subject": data.get('subject', 'Farewell Message Delivery'),
         "owner": data.get('owner', ''),
         "message_index": data.get('messageIndex', 0),
-        "claim_package_json": json.dumps(data, indent=2),
+        "claim_package_json": raw if raw is not None else json.dumps(data, indent=2),
         "claim_package_filename": Path(filepath).name,
         "crypto_scheme": crypto_scheme,
         "passphrase_hint": passphrase_hint,
     }
 
     print_success(f"Loaded claim package from: {filepath}")
-    print_info(f"  Recipients: {len(result['recipients'])}")
-    print_info(f"  Content hash: {result['content_hash'][:20]}...")
+    print_info_many((
+        f"  Recipients: {len(result['recipients'])}",
+        f"  Content hash: {result['content_hash'][:20]}...",
+    ))
     if crypto_scheme:
         print_info(f"  Crypto scheme: {crypto_scheme}")
     if passphrase_hint:
@@ -1049,18 +2170,18 @@ def load_message_from_file(filepath: str) -> Optional[Dict]:
     }
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        raw = Path(filepath).read_bytes()
+        data = _json_loads(raw)
     except FileNotFoundError:
         print_error(f"File not found: {filepath}")
         return None
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         print_error(f"Invalid JSON file: {e}")
         return None
 
     # Detect claim package format (exported from Farewell UI Claim tab)
     if data.get('type') == 'farewell-claim-package':
-        return _load_claim_package(data, filepath)
+        return _load_claim_package(data, filepath, raw)
 
     # Validate required fields (legacy/direct format)
     if 'recipients' not in data:
@@ -1074,24 +2195,27 @@ def load_message_from_file(filepath: str) -> Optional[Dict]:
         return None
 
     # Normalize field names (support both camelCase and snake_case)
-    recipients = data['recipients']
-    if isinstance(recipients, str):
-        recipients = [r.strip() for r in recipients.split(',') if r.strip()]
+    recipients, recipient_indices = normalize_recipients(data['recipients'])
 
-    content_hash = data.get('contentHash') or data.get('content_hash', '')
-    if not content_hash.startswith('0x'):
-        content_hash = '0x' + content_hash
+    try:
+        content_hash = normalize_content_hash(data.get('contentHash') or data.get('content_hash', ''))
+    except ValueError:
+        print_error("'contentHash' must be 0x followed by 64 hex characters")
+        return None
 
     result = {
         "recipients": recipients,
+        "recipient_indices": recipient_indices,
         "content_hash": content_hash,
         "message": data['message'],
         "subject": data.get('subject', 'Farewell Message Delivery')
     }
 
     print_success(f"Loaded message data from: {filepath}")
-    print_info(f"  Recipients: {len(result['recipients'])}")
-    print_info(f"  Content hash: {result['content_hash'][:20]}...")
+    print_info_many((
+        f"  Recipients: {len(result['recipients'])}",
+        f"  Content hash: {result['content_hash'][:20]}...",
+    ))
 
     return result
 
@@ -1103,12 +2227,18 @@ def get_message_info() -> Dict:
     print_info("Enter the information from the decrypted Farewell message:")
     print()
 
-    recipients = prompt("Recipient email(s) (comma-separated for multiple)").split(',')
-    recipients = [r.strip() for r in recipients if r.strip()]
+    recipients, recipient_indices = normalize_recipients(
+        prompt("Recipient email(s) (comma-separated for multiple)")
+    )
 
-    content_hash = prompt("Payload Content Hash (from contract, starts with 0x)")
-    if not content_hash.startswith('0x'):
-        content_hash = '0x' + content_hash
+    while True:
+        try:
+            content_hash = normalize_content_hash(
+                prompt("Payload Content Hash (from contract, starts with 0x)")
+            )
+            break
+        except ValueError:
+            print_error("Content hash must be 0x followed by 64 hex characters")
 
     message_content = []
     print_info("Enter the message content (end with an empty line):")
@@ -1120,12 +2250,13 @@ def get_message_info() -> Dict:
 
     return {
         "recipients": recipients,
+        "recipient_indices": recipient_indices,
         "content_hash": content_hash,
         "message": "\n".join(message_content),
         "subject": "Farewell Message Delivery"
     }
 
-def main_flow(message_file: Optional[str] = None):
+def main_flow(message_file: Optional[str] = None, use_async: bool = False):
     """Main application flow."""
     clear_screen()
     print_banner()
@@ -1195,80 +2326,121 @@ This tool will help you:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     proofs_dir = f"farewell_proofs_{timestamp}"
 
-    results = []
-    recipient_proofs = []
-    for i, recipient in enumerate(msg_info['recipients'], 1):
-        print(f"\n{Fore.CYAN}[{i}/{len(msg_info['recipients'])}]{Style.RESET_ALL} Processing: {recipient}")
+    recipients = msg_info['recipients']
+    recipient_indices = msg_info.get('recipient_indices') or [[i] for i in range(len(recipients))]
+    subject = msg_info.get('subject', 'Farewell Message Delivery')
+
+    # Body parts are identical for every recipient; build them once
+    text_part, html_part = build_body_parts(msg_info['message'], msg_info['content_hash'])
+    attachment_part = None
+    if msg_info.get('claim_package_json'):
+        attachment_part = build_attachment_part(
+            msg_info['claim_package_json'], msg_info.get('claim_package_filename')
+        )
 
-        # Create email
-        subject = msg_info.get('subject', 'Farewell Message Delivery')
-        email_msg = create_farewell_email(
+    def _envelope(recipient: str) -> MIMEMultipart:
+        return wrap_envelope(
+            text_part,
+            html_part,
             sender_email=smtp_config.email,
             sender_name=smtp_config.display_name or smtp_config.email,
             recipient_email=recipient,
             subject=subject,
-            message_body=msg_info['message'],
-            content_hash=msg_info['content_hash'],
-            attachment_json=msg_info.get('claim_package_json'),
-            attachment_filename=msg_info.get('claim_package_filename'),
+            attachment_part=attachment_part,
         )
 
-        # Send email
-        print_info(f"Sending email to {recipient}...")
-        success, raw_msg = send_email(smtp_config, email_msg, recipient)
-
-        if not success:
-            print_error(f"Failed to send: {raw_msg}")
-            results.append({"recipient": recipient, "success": False, "error": raw_msg})
-            continue
-
-        print_success("Email sent!")
+    if use_async and not smtp_config.use_oauth and not AIOSMTPLIB_AVAILABLE:
+        print_warning("--async needs aiosmtplib (pip install aiosmtplib); using threaded SMTP sends.")
+    send = send_emails_async if use_async else send_emails
+    limiter = RateLimiter(*smtp_config.rate_limit)
+    placeholder_warned = bool(os.environ.get("FAREWELL_PROVER_CMD", "").strip())
 
-        # Save .eml file
-        eml_filename = f"recipient_{i}_{recipient.replace('@', '_at_')}.eml"
-        eml_path = save_eml(raw_msg, eml_filename, proofs_dir)
-        print_success(f"Saved .eml: {eml_path}")
-
-        # Generate per-recipient proof
-        print_info("Generating proof...")
-        dkim_domain, dkim_selector = extract_dkim_domain_and_selector(raw_msg)
-        if dkim_domain:
-            print_info(f"DKIM: domain={dkim_domain} selector={dkim_selector or '?'}")
-        else:
-            print_error("DKIM-Signature header missing — publicSignals[1] will be zero.")
-        try:
-            proof = generate_proof_data(raw_msg, recipient, msg_info['content_hash'])
-        except RuntimeError as e:
-            print_error(f"Proof generation failed: {e}")
-            results.append({"recipient": recipient, "success": False, "error": str(e)})
-            continue
-
-        prover_cmd = os.environ.get("FAREWELL_PROVER_CMD", "").strip()
-        if not prover_cmd:
-            # Placeholder Groth16 points — flagged loudly so the user knows.
-            print_warning(
-                "Groth16 proof is a placeholder (pA/pB/pC = 0). "
-                "Set FAREWELL_PROVER_CMD to a real prover (e.g. a snarkjs "
-                "wrapper) to produce a proof that the on-chain verifier will "
-                "accept. See docs/proof-structure.md for the expected "
-                "circuit signals."
-            )
-
-        recipient_proofs.append({
-            "recipientIndex": i - 1,
-            "proof": proof,
-            "email": recipient,
-        })
-
-        results.append({
-            "recipient": recipient,
-            "success": True,
-            "eml_path": eml_path,
-        })
-
-        # Small delay between emails
-        if i < len(msg_info['recipients']):
-            time.sleep(1)
+    results = []
+    recipient_proofs = []
+    total = len(recipients)
+    content_hash = msg_info['content_hash']
+    print_info(f"Sending {total} email(s)...")
+    # Recipients go through build -> send -> save/prove one SEND_WINDOW at a
+    # time, so only a window's worth of sent messages is held in memory.
+    # .eml writes go to a small writer pool so disk I/O overlaps proof
+    # generation; proofs go to their own pool so external prover runs overlap.
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="eml-writer") as writer, \
+            ThreadPoolExecutor(max_workers=_prover_jobs(), thread_name_prefix="prover") as provers:
+        for offset in range(0, total, SEND_WINDOW):
+            window = recipients[offset:offset + SEND_WINDOW]
+            if smtp_config.use_oauth:
+                refresh_oauth_before_window(smtp_config, len(window))
+            send_results = send(smtp_config, [(_envelope(r), r) for r in window], limiter)
+
+            if not placeholder_warned and any(success for success, _ in send_results):
+                # Placeholder Groth16 points — flagged loudly (once per batch) so the user knows.
+                placeholder_warned = True
+                print()
+                print_warning(
+                    "Groth16 proofs are placeholders (pA/pB/pC = 0). "
+                    "Set FAREWELL_PROVER_CMD to a real prover (e.g. a snarkjs "
+                    "wrapper) to produce proofs that the on-chain verifier will "
+                    "accept. See docs/proof-structure.md for the expected "
+                    "circuit signals."
+                )
+
+            pending_proofs = []
+            for i, (recipient, (success, raw_msg)) in enumerate(zip(window, send_results), offset + 1):
+                print(f"\n{Fore.CYAN}[{i}/{total}]{Style.RESET_ALL} Processing: {recipient}")
+
+                if not success:
+                    print_error(f"Failed to send: {raw_msg}")
+                    results.append({"recipient": recipient, "success": False, "error": raw_msg})
+                    continue
+
+                print_success("Email sent!")
+
+                # Save .eml file
+                eml_filename = f"recipient_{i}_{recipient.replace('@', '_at_')}.eml"
+                eml_future = writer.submit(save_eml, raw_msg, eml_filename, proofs_dir)
+
+                # Generate per-recipient proof
+                print_info("Generating proof...")
+                dkim_domain, dkim_selector, _ = _dkim_signal(_eml_headers(raw_msg))
+                if dkim_domain:
+                    print_info(f"DKIM: domain={dkim_domain} selector={dkim_selector or '?'}")
+                else:
+                    print_error("DKIM-Signature header missing — publicSignals[1] will be zero.")
+                proof_future = provers.submit(generate_proof_data, raw_msg, recipient, content_hash)
+
+                result = {"recipient": recipient, "success": True}
+                results.append(result)
+                pending_proofs.append((i, result, proof_future, eml_future))
+            del send_results
+
+            # Finish this window's .eml copies and proofs before sending the
+            # next one. A recipient only counts as done, with a proof entry,
+            # once both succeeded.
+            for i, result, proof_future, eml_future in pending_proofs:
+                try:
+                    result["eml_path"] = eml_future.result()
+                except Exception as e:
+                    print_error(f"Could not save .eml for {result['recipient']}: {e}")
+                    result.update(success=False, error=str(e))
+                    proof_future.cancel()
+                    continue
+                print_success(f"Saved .eml: {result['eml_path']}")
+
+                try:
+                    proof = proof_future.result()
+                except Exception as e:
+                    # The mail already went out; record this recipient as
+                    # failed and keep the window's other proofs
+                    print_error(f"Proof generation failed for {result['recipient']}: {e}")
+                    result.update(success=False, error=str(e))
+                    continue
+
+                # One entry per on-chain index; a repeated address shares its proof
+                recipient_proofs.extend({
+                    "recipientIndex": index,
+                    "proof": proof,
+                    "email": result['recipient'],
+                } for index in recipient_indices[i - 1])
 
     # Save combined delivery proof JSON (matches Farewell UI DeliveryProofJson)
     delivery_proof_path = None
@@ -1332,6 +2504,7 @@ Examples:
   %(prog)s                       Interactive mode
   %(prog)s message.json          Load message data from JSON file
   %(prog)s -f message.json       Same as above (explicit flag)
+  %(prog)s --async message.json  Send over concurrent asyncio SMTP sessions
 
 Supports two JSON formats:
 
@@ -1364,6 +2537,12 @@ Export the claim package JSON from the Farewell UI after claiming a message.
         dest='file_flag',
         help='JSON file with message data (alternative to positional argument)'
     )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Send SMTP mail over several concurrent asyncio sessions (requires aiosmtplib)'
+    )
     return parser.parse_args()
 
 
@@ -1375,7 +2554,7 @@ def main():
     message_file = args.file or args.file_flag
 
     try:
-        main_flow(message_file)
+        main_flow(message_file, use_async=args.use_async)
     except KeyboardInterrupt:
         print(f"\n\n{Fore.YELLOW}Interrupted by user.{Style.RESET_ALL}")
         sys.exit(0)
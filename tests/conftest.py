@@ -5,33 +5,24 @@ Pytest fixtures for farewell-claimer tests.
 import pytest
 import sys
 import os
+import types
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Mock colorama before importing the module
-mock_fore = MagicMock()
-mock_fore.CYAN = ""
-mock_fore.MAGENTA = ""
-mock_fore.GREEN = ""
-mock_fore.BLUE = ""
-mock_fore.YELLOW = ""
-mock_fore.RED = ""
-mock_fore.WHITE = ""
-
-mock_style = MagicMock()
-mock_style.RESET_ALL = ""
-
-mock_back = MagicMock()
-
-# Patch colorama
-sys.modules['colorama'] = MagicMock()
-sys.modules['colorama'].init = MagicMock()
-sys.modules['colorama'].Fore = mock_fore
-sys.modules['colorama'].Back = mock_back
-sys.modules['colorama'].Style = mock_style
+# Stub colorama before importing the module. A real module with plain string
+# attributes keeps Fore/Style lookups cheap and makes a typo'd colour name an
+# AttributeError instead of a silently truthy MagicMock.
+fake_colorama = types.ModuleType('colorama')
+fake_colorama.Fore = types.SimpleNamespace(
+    CYAN="", MAGENTA="", GREEN="", BLUE="", YELLOW="", RED="", WHITE="",
+)
+fake_colorama.Style = types.SimpleNamespace(RESET_ALL="")
+fake_colorama.Back = types.SimpleNamespace()
+fake_colorama.init = lambda *args, **kwargs: None
+sys.modules['colorama'] = fake_colorama
 
 # Now we can import the module
 import farewell_claimer
@@ -51,6 +42,32 @@ def smtp_config():
     )
 
 
+@pytest.fixture
+def make_messages():
+    """Factory for (email_msg, recipient) pairs from ``config``.
+
+    ``recipients`` is a list of addresses, or a count for r0@test.com, r1@...
+    """
+    def make(config, recipients):
+        if isinstance(recipients, int):
+            recipients = [f"r{i}@test.com" for i in range(recipients)]
+        return [
+            (
+                farewell_claimer.create_farewell_email(
+                    sender_email=config.email,
+                    sender_name=config.display_name,
+                    recipient_email=recipient,
+                    subject="Test",
+                    message_body="Test body",
+                    content_hash="0x1234"
+                ),
+                recipient,
+            )
+            for recipient in recipients
+        ]
+    return make
+
+
 @pytest.fixture
 def smtp_config_ssl():
     """Create a test SMTP configuration with SSL."""
@@ -65,6 +82,22 @@ def smtp_config_ssl():
     )
 
 
+@pytest.fixture
+def gmail_oauth_config():
+    """Create a test Gmail OAuth configuration."""
+    return farewell_claimer.SMTPConfig(
+        host="gmail-api",
+        port=0,
+        use_tls=False,
+        use_ssl=False,
+        email="sender@gmail.com",
+        password="",
+        display_name="Test Sender",
+        use_oauth=True,
+        oauth_credentials=MagicMock()
+    )
+
+
 @pytest.fixture
 def sample_message_info():
     """Sample message information."""
@@ -75,6 +108,19 @@ def sample_message_info():
     }
 
 
+@pytest.fixture(scope='module')
+def sample_email():
+    """One prebuilt Farewell email, shared read-only by a module's tests."""
+    return farewell_claimer.create_farewell_email(
+        sender_email="sender@test.com",
+        sender_name="Test Sender",
+        recipient_email="recipient@test.com",
+        subject="Test Subject",
+        message_body="Test message body",
+        content_hash="0x1234567890abcdef"
+    )
+
+
 @pytest.fixture
 def sample_eml_content():
     """Sample .eml file content."""
@@ -127,3 +173,15 @@ def temp_output_dir(tmp_path):
     output_dir = tmp_path / "proofs"
     output_dir.mkdir()
     return str(output_dir)
+
+
+@pytest.fixture
+def mock_smtp_session():
+    """Factory for mock SMTP sessions that accept MAIL/RCPT/DATA."""
+    def make():
+        session = MagicMock()
+        session.mail.return_value = (250, b"OK")
+        session.rcpt.return_value = (250, b"OK")
+        session.data.return_value = (250, b"OK")
+        return session
+    return make
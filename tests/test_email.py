@@ -2,68 +2,61 @@
 Tests for email creation and sending functionality.
 """
 
+import base64
+import email
+import email.policy
+import json
+import os
+import stat
+
+from pathlib import Path
+
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 import smtplib
 
 import farewell_claimer
-from farewell_claimer import create_farewell_email, send_email, save_eml
+from farewell_claimer import (
+    build_body_parts,
+    create_farewell_email,
+    load_message_from_file,
+    normalize_content_hash,
+    normalize_recipients,
+    send_email,
+    send_emails,
+    send_emails_async,
+    send_emails_gmail_batch,
+    save_eml,
+    wrap_envelope,
+)
+
+
+def _plain_body(msg) -> str:
+    """Return the decoded text/plain body as a recipient's mail client sees it."""
+    parsed = email.message_from_bytes(msg.as_bytes(), policy=email.policy.default)
+    return parsed.get_body(preferencelist=('plain',)).get_content()
 
 
 class TestCreateFarewellEmail:
     """Tests for email creation."""
 
-    def test_create_email_returns_mime_multipart(self):
+    def test_create_email_returns_mime_multipart(self, sample_email):
         """Test that create_farewell_email returns MIMEMultipart."""
-        email = create_farewell_email(
-            sender_email="sender@test.com",
-            sender_name="Test Sender",
-            recipient_email="recipient@test.com",
-            subject="Test Subject",
-            message_body="Test message body",
-            content_hash="0x1234567890abcdef"
-        )
-        assert isinstance(email, MIMEMultipart)
+        assert isinstance(sample_email, MIMEMultipart)
 
-    def test_create_email_has_correct_headers(self):
+    def test_create_email_has_correct_headers(self, sample_email):
         """Test email has correct headers."""
-        email = create_farewell_email(
-            sender_email="sender@test.com",
-            sender_name="Test Sender",
-            recipient_email="recipient@test.com",
-            subject="Test Subject",
-            message_body="Test message body",
-            content_hash="0x1234567890abcdef"
-        )
-        assert email['From'] == "Test Sender <sender@test.com>"
-        assert email['To'] == "recipient@test.com"
-        assert email['Subject'] == "Test Subject"
-        assert email['Date'] is not None
-        assert email['Message-ID'] is not None
+        assert sample_email['From'] == "Test Sender <sender@test.com>"
+        assert sample_email['To'] == "recipient@test.com"
+        assert sample_email['Subject'] == "Test Subject"
+        assert sample_email['Date'] is not None
+        assert sample_email['Message-ID'] is not None
 
-    def test_create_email_contains_farewell_hash(self):
+    def test_create_email_contains_farewell_hash(self, sample_email):
         """Test email body contains Farewell-Hash."""
-        import base64
-        content_hash = "0x1234567890abcdef1234567890abcdef"
-        email = create_farewell_email(
-            sender_email="sender@test.com",
-            sender_name="Test Sender",
-            recipient_email="recipient@test.com",
-            subject="Test Subject",
-            message_body="Test message body",
-            content_hash=content_hash
-        )
-        # Check in the payload of the parts (may be base64 encoded)
-        for part in email.walk():
-            if part.get_content_type() == 'text/plain':
-                payload = part.get_payload(decode=True)
-                if payload:
-                    assert f"Farewell-Hash: {content_hash}" in payload.decode('utf-8')
-                    return
-        # Fallback: check raw string (in case not encoded)
-        raw_email = email.as_string()
-        assert content_hash in raw_email
+        assert "Farewell-Hash: 0x1234567890abcdef" in _plain_body(sample_email)
 
     def test_create_email_contains_message_body(self):
         """Test email contains the message body."""
@@ -76,30 +69,12 @@ class TestCreateFarewellEmail:
             message_body=message_body,
             content_hash="0x1234"
         )
-        # Check in the payload of the parts (may be base64 encoded)
-        for part in email.walk():
-            if part.get_content_type() == 'text/plain':
-                payload = part.get_payload(decode=True)
-                if payload:
-                    assert message_body in payload.decode('utf-8')
-                    return
-        # Fallback: check raw string
-        raw_email = email.as_string()
-        assert message_body in raw_email
-
-    def test_create_email_has_multipart_content(self):
+        assert message_body in _plain_body(email)
+
+    def test_create_email_has_multipart_content(self, sample_email):
         """Test email has both plain text and HTML parts."""
-        email = create_farewell_email(
-            sender_email="sender@test.com",
-            sender_name="Test Sender",
-            recipient_email="recipient@test.com",
-            subject="Test Subject",
-            message_body="Test message body",
-            content_hash="0x1234"
-        )
         # Should have 2 parts: text/plain and text/html
-        parts = list(email.walk())
-        content_types = [part.get_content_type() for part in parts]
+        content_types = [part.get_content_type() for part in sample_email.walk()]
         assert 'text/plain' in content_types
         assert 'text/html' in content_types
 
@@ -116,13 +91,105 @@ class TestCreateFarewellEmail:
         assert "mydomain.com" in email['Message-ID']
 
 
+class TestSharedBodyParts:
+    """Tests for building body parts once and wrapping them per recipient."""
+
+    def test_shared_parts_render_for_each_recipient(self):
+        """Test that one set of body parts can be wrapped for many recipients."""
+        text_part, html_part = build_body_parts("Shared body", "0xabcd")
+        first = wrap_envelope(text_part, html_part, "sender@test.com", "Sender", "a@test.com", "Subject")
+        second = wrap_envelope(text_part, html_part, "sender@test.com", "Sender", "b@test.com", "Subject")
+
+        assert first['To'] == "a@test.com"
+        assert second['To'] == "b@test.com"
+        assert first['Message-ID'] != second['Message-ID']
+        # Serializing one envelope must not disturb the shared parts
+        first.as_string()
+        for msg in (first, second):
+            assert "Farewell-Hash: 0xabcd" in _plain_body(msg)
+
+    def test_wrap_envelope_with_attachment_is_mixed(self):
+        """Test that an attachment part produces a multipart/mixed message."""
+        text_part, html_part = build_body_parts("Body", "0x1234")
+        attachment = farewell_claimer.build_attachment_part('{"a": 1}', "pkg.json")
+        msg = wrap_envelope(text_part, html_part, "sender@test.com", "Sender", "a@test.com", "S", attachment)
+
+        assert msg.get_content_type() == 'multipart/mixed'
+        filenames = [p.get_filename() for p in msg.walk() if p.get_filename()]
+        assert filenames == ["pkg.json"]
+
+    def test_body_templates_render_once_per_message(self):
+        """Test that repeated emails for one message reuse the rendered bodies."""
+        farewell_claimer._render_bodies.cache_clear()
+        for recipient in ("a@test.com", "b@test.com", "c@test.com"):
+            create_farewell_email("sender@test.com", "Sender", recipient, "S", "Cached body", "0xfeed")
+
+        info = farewell_claimer._render_bodies.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
+
+    def test_templates_keep_braces_in_message(self):
+        """Test that format_map leaves braces in the message alone, and HTML lines become <br>."""
+        body = "Keep {this} and {{that}}\nsecond line"
+        farewell_claimer._render_bodies.cache_clear()
+
+        plain, html_body = farewell_claimer._render_bodies(body, "0xabcd")
+
+        assert plain.startswith(body + "\n")
+        assert "Keep {this} and {{that}}<br>second line" in html_body
+
+    @pytest.mark.parametrize("body, encoding", [
+        ("Plain ASCII goodbye", "7bit"),
+        ("Adiós, mis amigos. Nos vemos pronto.", "8bit"),
+        ("再见" * 40, "8bit"),
+        ("x" * 1200, "base64"),
+    ])
+    def test_body_transfer_encoding(self, body, encoding):
+        """Test that bodies are left unencoded unless a line is too long for SMTP, and round-trip."""
+        text_part, _ = build_body_parts(body, "0xabcd")
+
+        assert text_part['Content-Transfer-Encoding'] == encoding
+        assert body in text_part.get_payload(decode=True).decode(text_part.get_content_charset())
+
+    @pytest.mark.parametrize("body", ["Plain ASCII goodbye", "Olá amigo, até logo"])
+    def test_hash_line_unbroken_on_the_wire(self, body):
+        """Test that the full 0x + 64-hex Farewell-Hash line survives flattening byte-for-byte."""
+        content_hash = "0x" + "ab" * 32
+        msg = create_farewell_email("sender@test.com", "Sender", "r@test.com", "S", body, content_hash)
+
+        raw = farewell_claimer.flatten_for_smtp(msg)
+
+        assert f"Farewell-Hash: {content_hash}\r\n".encode() in raw
+        assert f">{content_hash}</code>".encode() in raw
+        assert b"quoted-printable" not in raw
+
+
+class TestAttachmentEncoding:
+    """Tests for the base64 attachment encoder."""
+
+    @pytest.mark.parametrize("pybase64_available", [True, False])
+    @pytest.mark.parametrize("size", [0, 1, 57, 58, 10_000])
+    def test_matches_stdlib_encoder(self, monkeypatch, pybase64_available, size):
+        """Test that attachments serialize byte-identically to email.encoders.encode_base64."""
+        if pybase64_available and not hasattr(farewell_claimer, "pybase64"):
+            pytest.skip("pybase64 not installed")
+        monkeypatch.setattr(farewell_claimer, "PYBASE64_AVAILABLE", pybase64_available)
+        data = bytes(range(256)) * (size // 256 + 1)
+        data = data[:size]
+
+        fast = farewell_claimer.build_attachment_part(data, "pkg.json")
+        stdlib = MIMEApplication(data, _subtype='json')
+        stdlib.add_header('Content-Disposition', 'attachment', filename="pkg.json")
+
+        assert fast.as_bytes() == stdlib.as_bytes()
+
+
 class TestSendEmail:
     """Tests for email sending."""
 
     @patch('farewell_claimer.smtplib.SMTP')
-    def test_send_email_success(self, mock_smtp_class, smtp_config):
+    def test_send_email_success(self, mock_smtp_class, smtp_config, mock_smtp_session):
         """Test successful email sending."""
-        mock_smtp = MagicMock()
+        mock_smtp = mock_smtp_session()
         mock_smtp_class.return_value = mock_smtp
 
         email = create_farewell_email(
@@ -138,12 +205,12 @@ class TestSendEmail:
 
         assert success is True
         assert len(raw_msg) > 0
-        mock_smtp.sendmail.assert_called_once()
+        mock_smtp.data.assert_called_once()
 
     @patch('farewell_claimer.smtplib.SMTP_SSL')
-    def test_send_email_ssl_success(self, mock_smtp_ssl_class, smtp_config_ssl):
+    def test_send_email_ssl_success(self, mock_smtp_ssl_class, smtp_config_ssl, mock_smtp_session):
         """Test successful email sending with SSL."""
-        mock_smtp = MagicMock()
+        mock_smtp = mock_smtp_session()
         mock_smtp_ssl_class.return_value = mock_smtp
 
         email = create_farewell_email(
@@ -161,10 +228,10 @@ class TestSendEmail:
         mock_smtp_ssl_class.assert_called_once()
 
     @patch('farewell_claimer.smtplib.SMTP')
-    def test_send_email_failure(self, mock_smtp_class, smtp_config):
+    def test_send_email_failure(self, mock_smtp_class, smtp_config, mock_smtp_session):
         """Test failed email sending."""
-        mock_smtp = MagicMock()
-        mock_smtp.sendmail.side_effect = Exception("Send failed")
+        mock_smtp = mock_smtp_session()
+        mock_smtp.data.side_effect = Exception("Send failed")
         mock_smtp_class.return_value = mock_smtp
 
         email = create_farewell_email(
@@ -182,9 +249,30 @@ class TestSendEmail:
         assert "Send failed" in error_msg
 
     @patch('farewell_claimer.smtplib.SMTP')
-    def test_send_email_returns_raw_message(self, mock_smtp_class, smtp_config):
+    def test_send_email_failure_closes_connection(self, mock_smtp_class, smtp_config, mock_smtp_session):
+        """Test that a failed send closes the session instead of leaking it."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp.data.side_effect = smtplib.SMTPServerDisconnected("gone")
+        mock_smtp_class.return_value = mock_smtp
+        email = create_farewell_email(
+            sender_email=smtp_config.email,
+            sender_name=smtp_config.display_name,
+            recipient_email="recipient@test.com",
+            subject="Test",
+            message_body="Test body",
+            content_hash="0x1234"
+        )
+
+        success, _ = send_email(smtp_config, email, "recipient@test.com")
+
+        assert success is False
+        mock_smtp.close.assert_called_once()
+        mock_smtp.quit.assert_not_called()
+
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_email_returns_raw_message(self, mock_smtp_class, smtp_config, mock_smtp_session):
         """Test that successful send returns raw email message."""
-        mock_smtp = MagicMock()
+        mock_smtp = mock_smtp_session()
         mock_smtp_class.return_value = mock_smtp
 
         email = create_farewell_email(
@@ -199,13 +287,587 @@ class TestSendEmail:
         success, raw_msg = send_email(smtp_config, email, "recipient@test.com")
 
         assert success is True
-        assert "Test Subject" in raw_msg
+        assert isinstance(raw_msg, bytes)
+        assert b"Test Subject" in raw_msg
         # Content may be base64 encoded, so check for presence of hash in any form
         # or check for base64 encoded version
         import base64
-        hash_plain = "Farewell-Hash"
-        hash_b64 = base64.b64encode(hash_plain.encode()).decode()
-        assert hash_plain in raw_msg or hash_b64[:10] in raw_msg or "0x1234" in raw_msg
+        hash_plain = b"Farewell-Hash"
+        hash_b64 = base64.b64encode(hash_plain)
+        assert hash_plain in raw_msg or hash_b64[:10] in raw_msg or b"0x1234" in raw_msg
+
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_email_internationalized_address_sends_flattened_bytes(
+        self, mock_smtp_class, smtp_config, mock_smtp_session
+    ):
+        """Test that a non-ASCII address is sent with SMTPUTF8 and returns exactly the bytes sent."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp.sendmail.return_value = {}
+        mock_smtp_class.return_value = mock_smtp
+        recipient = "josé@exämple.com"
+        email = create_farewell_email(smtp_config.email, None, recipient, "Test", "Olá amigo", "0x1234")
+
+        success, raw_msg = send_email(smtp_config, email, recipient)
+
+        assert success is True
+        (sender, rcpts, sent), kwargs = mock_smtp.sendmail.call_args
+        assert (sender, rcpts) == (smtp_config.email, [recipient])
+        assert kwargs["mail_options"][0] == 'SMTPUTF8'
+        assert raw_msg == sent == farewell_claimer.flatten_for_smtp(email)
+        assert b"\n" not in sent.replace(b"\r\n", b"")
+        mock_smtp.send_message.assert_not_called()
+
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_email_declares_8bit_body(self, mock_smtp_class, smtp_config, mock_smtp_session):
+        """Test that an 8bit UTF-8 body is sent as is, with BODY=8BITMIME, when the server offers it."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp.has_extn.side_effect = lambda name: name == '8bitmime'
+        mock_smtp_class.return_value = mock_smtp
+        email = create_farewell_email(smtp_config.email, None, "recipient@test.com", "Test", "Olá amigo", "0x1234")
+
+        success, raw_msg = send_email(smtp_config, email, "recipient@test.com")
+
+        assert success is True
+        mock_smtp.mail.assert_called_once_with(smtp_config.email, ['BODY=8BITMIME'])
+        assert raw_msg == mock_smtp.data.call_args.args[0] == farewell_claimer.flatten_for_smtp(email)
+
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_email_without_8bitmime_sends_base64(self, mock_smtp_class, smtp_config, mock_smtp_session):
+        """Test that no 8bit bytes reach DATA when the server lacks 8BITMIME, and the hash survives."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp.has_extn.return_value = False
+        mock_smtp_class.return_value = mock_smtp
+        content_hash = "0x" + "ab" * 32
+        msg = create_farewell_email(smtp_config.email, None, "recipient@test.com", "Test", "Olá amigo", content_hash)
+        original = farewell_claimer.flatten_for_smtp(msg)
+
+        success, raw_msg = send_email(smtp_config, msg, "recipient@test.com")
+
+        assert success is True
+        sent = mock_smtp.data.call_args.args[0]
+        assert raw_msg == sent and sent.isascii()
+        mock_smtp.mail.assert_called_once_with(smtp_config.email, [])
+        plain = email.message_from_bytes(sent, policy=email.policy.default).get_body(('plain',))
+        assert plain['Content-Transfer-Encoding'] == 'base64'
+        assert f"Farewell-Hash: {content_hash}\n" in plain.get_content()
+        assert farewell_claimer.flatten_for_smtp(msg) == original  # shared parts untouched
+
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_email_uses_bare_transaction(self, mock_smtp_class, smtp_config, mock_smtp_session):
+        """Test that sends skip EHLO/RSET and pass CRLF bytes to DATA."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp_class.return_value = mock_smtp
+        email = create_farewell_email(
+            sender_email=smtp_config.email,
+            sender_name=smtp_config.display_name,
+            recipient_email="recipient@test.com",
+            subject="Test",
+            message_body="Test body",
+            content_hash="0x1234"
+        )
+
+        success, raw_msg = send_email(smtp_config, email, "recipient@test.com")
+
+        assert success is True
+        mock_smtp.mail.assert_called_once_with(smtp_config.email, [])
+        mock_smtp.rcpt.assert_called_once_with("recipient@test.com")
+        sent = mock_smtp.data.call_args.args[0]
+        assert isinstance(sent, bytes)
+        assert b"\r\n" in sent and b"\n" not in sent.replace(b"\r\n", b"")
+        assert raw_msg == sent
+        assert mock_smtp.ehlo.call_count == 2  # connect + after STARTTLS only
+        mock_smtp.rset.assert_not_called()
+
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_email_resets_failed_transaction(self, mock_smtp_class, smtp_config, mock_smtp_session):
+        """Test that a refused recipient clears the transaction with RSET."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp.rcpt.return_value = (550, b"No such user")
+        mock_smtp_class.return_value = mock_smtp
+        email = create_farewell_email(
+            sender_email=smtp_config.email,
+            sender_name=smtp_config.display_name,
+            recipient_email="missing@test.com",
+            subject="Test",
+            message_body="Test body",
+            content_hash="0x1234"
+        )
+
+        success, error_msg = send_email(smtp_config, email, "missing@test.com")
+
+        assert success is False
+        assert "No such user" in error_msg
+        mock_smtp.rset.assert_called_once()
+        mock_smtp.data.assert_not_called()
+
+
+class TestSendEmails:
+    """Tests for batch sending over a shared SMTP session."""
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_emails_reuses_one_session(self, mock_smtp_class, mock_sleep, smtp_config, mock_smtp_session, make_messages):
+        """Test that a batch connects and logs in only once."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp_class.return_value = mock_smtp
+        recipients = ["a@test.com", "b@test.com", "c@test.com"]
+
+        results = send_emails(smtp_config, make_messages(smtp_config, recipients))
+
+        assert [success for success, _ in results] == [True, True, True]
+        mock_smtp_class.assert_called_once()
+        mock_smtp.login.assert_called_once()
+        assert mock_smtp.data.call_count == 3
+        mock_smtp.quit.assert_called_once()
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_emails_parallel_workers_close_their_sessions(self, mock_smtp_class, mock_sleep, smtp_config, mock_smtp_session, make_messages):
+        """Test that parallel workers each reuse and finally quit their own session."""
+        smtp_config.rate_limit = (4, 4.0)
+        sessions = []
+
+        def new_session(*args, **kwargs):
+            session = mock_smtp_session()
+            sessions.append(session)
+            return session
+        mock_smtp_class.side_effect = new_session
+        recipients = [f"r{i}@test.com" for i in range(8)]
+
+        results = send_emails(smtp_config, make_messages(smtp_config, recipients))
+
+        assert all(success for success, _ in results)
+        assert 1 <= len(sessions) <= 4
+        assert sum(s.data.call_count for s in sessions) == 8
+        for session in sessions:
+            session.quit.assert_called_once()
+        sent_to = [c.args[0] for s in sessions for c in s.rcpt.call_args_list]
+        assert sorted(sent_to) == sorted(recipients)
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_emails_reconnects_after_disconnect(self, mock_smtp_class, mock_sleep, smtp_config, mock_smtp_session, make_messages):
+        """Test that a dropped session is reopened and the message retried."""
+        dropped = mock_smtp_session()
+        dropped.data.side_effect = smtplib.SMTPServerDisconnected("gone")
+        fresh = mock_smtp_session()
+        mock_smtp_class.side_effect = [dropped, fresh]
+
+        results = send_emails(smtp_config, make_messages(smtp_config, ["a@test.com", "b@test.com"]))
+
+        assert [success for success, _ in results] == [True, True]
+        assert mock_smtp_class.call_count == 2
+        assert fresh.data.call_count == 2
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_emails_backs_off_on_throttling(self, mock_smtp_class, mock_sleep, smtp_config, mock_smtp_session, make_messages):
+        """Test that a temporary 4xx rejection is retried after backing off."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp.data.side_effect = [smtplib.SMTPDataError(451, b"Rate limited"), (250, b"OK")]
+        mock_smtp_class.return_value = mock_smtp
+
+        results = send_emails(smtp_config, make_messages(smtp_config, ["a@test.com"]))
+
+        assert results[0][0] is True
+        assert mock_smtp.data.call_count == 2
+        mock_sleep.assert_called()
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_send_emails_reports_per_recipient_failure(self, mock_smtp_class, mock_sleep, smtp_config, mock_smtp_session, make_messages):
+        """Test that one refused recipient does not abort the batch."""
+        mock_smtp = mock_smtp_session()
+        mock_smtp.data.side_effect = [Exception("Recipient refused"), (250, b"OK")]
+        mock_smtp_class.return_value = mock_smtp
+
+        results = send_emails(smtp_config, make_messages(smtp_config, ["bad@test.com", "good@test.com"]))
+
+        assert results[0] == (False, "Recipient refused")
+        assert results[1][0] is True
+
+
+class TestMainFlowPipeline:
+    """Tests for sending and proving recipients in bounded windows."""
+
+    def _run(self, smtp_config, tmp_path, monkeypatch, recipients, prove=None):
+        """Run main_flow on a message file with every send succeeding; return the send mock.
+
+        ``prove`` optionally replaces generate_proof_data.
+        """
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("FAREWELL_PROVER_CMD", raising=False)
+        message_file = tmp_path / "message.json"
+        message_file.write_text(json.dumps({
+            "recipients": recipients,
+            "contentHash": "0x" + "ab" * 32,
+            "message": "Goodbye",
+        }))
+
+        def fake_send(config, messages, limiter):
+            return [(True, farewell_claimer.flatten_for_smtp(msg)) for msg, _ in messages]
+
+        with patch.object(farewell_claimer, 'clear_screen'), \
+                patch('builtins.input', return_value=""), \
+                patch.object(farewell_claimer, 'setup_smtp', return_value=smtp_config), \
+                patch.object(farewell_claimer, 'test_smtp_connection', return_value=True), \
+                patch.object(farewell_claimer, 'confirm', return_value=True), \
+                patch.object(farewell_claimer, 'send_emails', side_effect=fake_send) as mock_send, \
+                patch.object(farewell_claimer, 'generate_proof_data',
+                             side_effect=prove or farewell_claimer.generate_proof_data):
+            farewell_claimer.main_flow(str(message_file))
+        return mock_send
+
+    def _delivery(self, tmp_path):
+        (proofs_dir,) = tmp_path.glob("farewell_proofs_*")
+        return proofs_dir, json.loads((proofs_dir / "delivery-proof.json").read_text())
+
+    def test_sends_in_windows_with_shared_limiter(self, smtp_config, tmp_path, monkeypatch):
+        """Test that main_flow never hands more than SEND_WINDOW messages to a send."""
+        monkeypatch.setattr(farewell_claimer, "SEND_WINDOW", 2)
+        mock_send = self._run(smtp_config, tmp_path, monkeypatch, ["a@x.com", "b@x.com", "c@x.com"])
+
+        windows = [[r for _, r in c.args[1]] for c in mock_send.call_args_list]
+        assert windows == [["a@x.com", "b@x.com"], ["c@x.com"]]
+        limiters = {id(c.args[2]) for c in mock_send.call_args_list}
+        assert len(limiters) == 1
+
+        proofs_dir, delivery = self._delivery(tmp_path)
+        assert [r["recipientIndex"] for r in delivery["recipients"]] == [0, 1, 2]
+        assert len(list(proofs_dir.glob("*.eml"))) == 3
+
+    @pytest.mark.parametrize("error", [OSError("disk gone"), ValueError("bad signals"), json.JSONDecodeError("x", "", 0)])
+    def test_prover_error_marks_only_that_recipient_failed(self, smtp_config, tmp_path, monkeypatch, capsys, error):
+        """Test that any prover exception fails one recipient without losing the others' proofs."""
+        real_prove = farewell_claimer.generate_proof_data
+
+        def prove(raw_msg, recipient, content_hash):
+            if recipient == "b@x.com":
+                raise error
+            return real_prove(raw_msg, recipient, content_hash)
+
+        self._run(smtp_config, tmp_path, monkeypatch, ["a@x.com", "b@x.com", "c@x.com"], prove=prove)
+
+        _, delivery = self._delivery(tmp_path)
+        assert [r["recipientIndex"] for r in delivery["recipients"]] == [0, 2]
+        assert "Proof generation failed for b@x.com" in capsys.readouterr().out
+
+    def test_eml_save_failure_drops_that_recipients_proof(self, smtp_config, tmp_path, monkeypatch, capsys):
+        """Test that a failed .eml copy marks the recipient failed and leaves out its proof."""
+        real_save = farewell_claimer.save_eml
+
+        def save(raw_msg, filename, output_dir):
+            if "b_at_x.com" in filename:
+                raise OSError("disk full")
+            return real_save(raw_msg, filename, output_dir)
+
+        monkeypatch.setattr(farewell_claimer, "save_eml", save)
+        self._run(smtp_config, tmp_path, monkeypatch, ["a@x.com", "b@x.com", "c@x.com"])
+
+        _, delivery = self._delivery(tmp_path)
+        assert [r["recipientIndex"] for r in delivery["recipients"]] == [0, 2]
+        out = capsys.readouterr().out
+        assert "Could not save .eml for b@x.com: disk full" in out
+        assert "2 email(s) sent successfully!" in out and "1 email(s) failed:" in out
+
+    def test_duplicate_recipient_gets_proof_for_every_index(self, smtp_config, tmp_path, monkeypatch):
+        """Test that a repeated address is mailed once but proven for each on-chain index."""
+        mock_send = self._run(smtp_config, tmp_path, monkeypatch, ["a@x.com", "b@x.com", "A@x.com"])
+
+        sent = [r for c in mock_send.call_args_list for _, r in c.args[1]]
+        assert sent == ["a@x.com", "b@x.com"]
+        _, delivery = self._delivery(tmp_path)
+        entries = sorted((r["recipientIndex"], r["email"]) for r in delivery["recipients"])
+        assert entries == [(0, "a@x.com"), (1, "b@x.com"), (2, "a@x.com")]
+        by_index = {r["recipientIndex"]: r["proof"] for r in delivery["recipients"]}
+        assert by_index[0] == by_index[2]
+
+
+@pytest.mark.skipif(not farewell_claimer.AIOSMTPLIB_AVAILABLE, reason="aiosmtplib not installed")
+class TestSendEmailsAsync:
+    """Tests for the aiosmtplib (--async) send path."""
+
+    def _unlimited(self):
+        return farewell_claimer.RateLimiter(100, 100.0)
+
+    @patch('farewell_claimer.aiosmtplib.SMTP')
+    def test_sends_over_concurrent_sessions(self, mock_smtp_class, smtp_config, make_messages):
+        """Test that messages are spread across ASYNC_SMTP_CLIENTS sessions, each closed once."""
+        clients = []
+
+        def new_client(**kwargs):
+            client = AsyncMock()
+            clients.append(client)
+            return client
+
+        mock_smtp_class.side_effect = new_client
+        count = farewell_claimer.ASYNC_SMTP_CLIENTS * 2
+
+        results = send_emails_async(smtp_config, make_messages(smtp_config, count), self._unlimited())
+
+        assert all(success for success, _ in results)
+        assert len(clients) == farewell_claimer.ASYNC_SMTP_CLIENTS
+        for client in clients:
+            client.login.assert_awaited_once_with("sender@test.com", "testpassword")
+            assert client.sendmail.await_count == 2
+            client.quit.assert_awaited_once()
+        assert mock_smtp_class.call_args.kwargs["start_tls"] is True
+
+    @patch('farewell_claimer.aiosmtplib.SMTP')
+    def test_retries_throttled_send(self, mock_smtp_class, smtp_config, make_messages):
+        """Test that a temporary 4xx rejection is retried on the same session."""
+        client = AsyncMock()
+        client.sendmail.side_effect = [
+            farewell_claimer.aiosmtplib.SMTPResponseException(451, "Try again later"),
+            None,
+        ]
+        mock_smtp_class.return_value = client
+
+        results = send_emails_async(smtp_config, make_messages(smtp_config, 1), self._unlimited())
+
+        assert results[0][0] is True
+        assert client.sendmail.await_count == 2
+
+    @patch('farewell_claimer.aiosmtplib.SMTP')
+    def test_reconnects_after_disconnect(self, mock_smtp_class, smtp_config, make_messages):
+        """Test that a dropped session is reopened for the next attempt."""
+        dropped, fresh = AsyncMock(), AsyncMock()
+        dropped.sendmail.side_effect = farewell_claimer.aiosmtplib.SMTPServerDisconnected("gone")
+        mock_smtp_class.side_effect = [dropped, fresh]
+
+        results = send_emails_async(smtp_config, make_messages(smtp_config, 1), self._unlimited())
+
+        assert results[0][0] is True
+        fresh.sendmail.assert_awaited_once()
+
+    @patch('farewell_claimer.aiosmtplib.SMTP')
+    def test_internationalized_address_requests_smtputf8(self, mock_smtp_class, smtp_config):
+        """Test that a non-ASCII recipient is sent with SMTPUTF8, and ASCII ones without it."""
+        client = AsyncMock()
+        client.supports_extension = MagicMock(return_value=True)
+        mock_smtp_class.return_value = client
+        messages = [
+            (create_farewell_email(smtp_config.email, None, rcpt, "Test", "Test body", "0x1234"), rcpt)
+            for rcpt in ("josé@exämple.com", "r@test.com")
+        ]
+
+        results = send_emails_async(smtp_config, messages, self._unlimited())
+
+        assert all(success for success, _ in results)
+        options = {c.args[1][0]: c.kwargs["mail_options"] for c in client.sendmail.call_args_list}
+        assert options == {"josé@exämple.com": ['SMTPUTF8'], "r@test.com": []}
+
+    @pytest.mark.parametrize("advertised", [True, False])
+    @patch('farewell_claimer.aiosmtplib.SMTP')
+    def test_8bit_body_follows_server_8bitmime(self, mock_smtp_class, smtp_config, advertised):
+        """Test that an 8bit body is declared when offered and sent as 7bit base64 otherwise."""
+        client = AsyncMock()
+        client.supports_extension = MagicMock(return_value=advertised)
+        mock_smtp_class.return_value = client
+        email = create_farewell_email(smtp_config.email, None, "r@test.com", "Test", "Olá amigo", "0x1234")
+
+        results = send_emails_async(smtp_config, [(email, "r@test.com")], self._unlimited())
+
+        assert results[0][0] is True
+        (_, _, sent), kwargs = client.sendmail.call_args
+        assert results[0][1] == sent
+        assert kwargs["mail_options"] == (['BODY=8BITMIME'] if advertised else [])
+        assert sent.isascii() is not advertised
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_falls_back_without_aiosmtplib(self, mock_smtp_class, mock_sleep, smtp_config, mock_smtp_session, monkeypatch, make_messages):
+        """Test that the threaded smtplib path is used when aiosmtplib is missing."""
+        monkeypatch.setattr(farewell_claimer, "AIOSMTPLIB_AVAILABLE", False)
+        mock_smtp_class.return_value = mock_smtp_session()
+
+        results = send_emails_async(smtp_config, make_messages(smtp_config, 2))
+
+        assert [success for success, _ in results] == [True, True]
+        mock_smtp_class.assert_called_once()
+
+
+class TestSendEmailsGmailBatch:
+    """Tests for Gmail API batch sending."""
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        with patch('farewell_claimer.time.sleep') as mock_sleep:
+            yield mock_sleep
+
+    def _mock_service(self, failing_ids=()):
+        """Service whose batches invoke the callback for every added request."""
+        service = MagicMock()
+
+        def new_batch(callback):
+            batch = MagicMock()
+            added = []
+            batch.add.side_effect = lambda request, request_id: added.append(request_id)
+
+            def execute():
+                for request_id in added:
+                    error = Exception("quota") if request_id in failing_ids else None
+                    callback(request_id, {} if error is None else None, error)
+            batch.execute.side_effect = execute
+            return batch
+
+        service.new_batch_http_request.side_effect = new_batch
+        return service
+
+    @patch('farewell_claimer.build')
+    def test_batch_sends_all_in_one_request(self, mock_build, gmail_oauth_config, make_messages):
+        """Test that a small batch uses a single batch HTTP request."""
+        service = self._mock_service()
+        mock_build.return_value = service
+
+        results = send_emails_gmail_batch(gmail_oauth_config, make_messages(gmail_oauth_config, 3))
+
+        assert [success for success, _ in results] == [True, True, True]
+        assert service.new_batch_http_request.call_count == 1
+        assert b"Subject: Test" in results[0][1]
+
+    @patch('farewell_claimer.build')
+    def test_batch_is_chunked(self, mock_build, gmail_oauth_config, make_messages):
+        """Test that large batches are split at GMAIL_BATCH_SIZE."""
+        service = self._mock_service()
+        mock_build.return_value = service
+        count = farewell_claimer.GMAIL_BATCH_SIZE + 1
+
+        results = send_emails_gmail_batch(gmail_oauth_config, make_messages(gmail_oauth_config, count))
+
+        assert len(results) == count
+        assert all(success for success, _ in results)
+        assert service.new_batch_http_request.call_count == 2
+
+    @patch('farewell_claimer.build')
+    def test_batch_reports_individual_failures(self, mock_build, gmail_oauth_config, make_messages):
+        """Test that a failed send in a batch is reported for that recipient only."""
+        mock_build.return_value = self._mock_service(failing_ids={"1"})
+
+        results = send_emails_gmail_batch(gmail_oauth_config, make_messages(gmail_oauth_config, 3))
+
+        assert results[0][0] is True
+        assert results[1] == (False, "Gmail API error: quota")
+        assert results[2][0] is True
+
+    @patch('farewell_claimer.build')
+    def test_batch_retries_throttled_sends(self, mock_build, gmail_oauth_config, no_sleep, make_messages):
+        """Test that rate-limited sends are retried after backing off."""
+        service = MagicMock()
+        calls = []
+
+        def new_batch(callback):
+            batch = MagicMock()
+            added = []
+            batch.add.side_effect = lambda request, request_id: added.append(request_id)
+
+            def execute():
+                calls.append(list(added))
+                for request_id in added:
+                    error = None
+                    if len(calls) == 1 and request_id == "0":
+                        error = Exception("429 Too Many Requests")
+                        error.resp = MagicMock(status=429)
+                        error.resp.get.return_value = "7"
+                    callback(request_id, {} if error is None else None, error)
+            batch.execute.side_effect = execute
+            return batch
+
+        service.new_batch_http_request.side_effect = new_batch
+        mock_build.return_value = service
+
+        results = send_emails_gmail_batch(gmail_oauth_config, make_messages(gmail_oauth_config, 2))
+
+        assert [success for success, _ in results] == [True, True]
+        assert calls == [["0", "1"], ["0"]]
+        no_sleep.assert_any_call(7.0)
+
+    @patch('farewell_claimer.build')
+    def test_service_is_built_once_per_config(self, mock_build, gmail_oauth_config, make_messages):
+        """Test that repeated batches reuse the cached Gmail service."""
+        mock_build.return_value = self._mock_service()
+
+        send_emails_gmail_batch(gmail_oauth_config, make_messages(gmail_oauth_config, 1))
+        send_emails_gmail_batch(gmail_oauth_config, make_messages(gmail_oauth_config, 1))
+
+        mock_build.assert_called_once()
+        assert gmail_oauth_config.gmail_service is mock_build.return_value
+
+    @patch('farewell_claimer.build')
+    def test_service_uses_one_authorized_transport(self, mock_build, gmail_oauth_config):
+        """Test that the service is built over a single keep-alive AuthorizedHttp."""
+        mock_build.return_value = self._mock_service()
+
+        farewell_claimer.get_gmail_service(gmail_oauth_config)
+
+        http = mock_build.call_args.kwargs['http']
+        assert isinstance(http, farewell_claimer.AuthorizedHttp)
+        assert http.credentials is gmail_oauth_config.oauth_credentials
+        assert 'credentials' not in mock_build.call_args.kwargs
+
+    @patch('farewell_claimer.build')
+    def test_send_emails_dispatches_to_batch(self, mock_build, gmail_oauth_config, make_messages):
+        """Test that send_emails uses the batch path for OAuth configs."""
+        service = self._mock_service()
+        mock_build.return_value = service
+
+        results = send_emails(gmail_oauth_config, make_messages(gmail_oauth_config, 2))
+
+        assert len(results) == 2
+        service.users().messages().send().execute.assert_not_called()
+
+    @patch('farewell_claimer.build')
+    def test_raw_payload_is_message_bytes(self, mock_build, gmail_oauth_config, make_messages):
+        """Test that the Gmail raw payload is the base64url of the flattened bytes."""
+        service = self._mock_service()
+        mock_build.return_value = service
+        messages = make_messages(gmail_oauth_config, 1)
+
+        results = send_emails_gmail_batch(gmail_oauth_config, messages)
+
+        body = service.users().messages().send.call_args.kwargs['body']
+        raw = base64.urlsafe_b64decode(body['raw'])
+        assert raw == messages[0][0].as_bytes()
+        assert results[0] == (True, raw)
+
+
+class TestRateLimiter:
+    """Tests for the token-bucket rate limiter."""
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.time.monotonic', return_value=100.0)
+    def test_burst_within_capacity_does_not_sleep(self, mock_monotonic, mock_sleep):
+        """Test that sends up to the bucket capacity go out immediately."""
+        limiter = farewell_claimer.RateLimiter(capacity=3, refill_per_sec=1.0)
+        for _ in range(3):
+            limiter.acquire()
+        mock_sleep.assert_not_called()
+
+    @patch('farewell_claimer.time.sleep')
+    @patch('farewell_claimer.time.monotonic', return_value=100.0)
+    def test_acquire_beyond_capacity_waits_for_refill(self, mock_monotonic, mock_sleep):
+        """Test that an empty bucket waits one refill interval per token."""
+        limiter = farewell_claimer.RateLimiter(capacity=1, refill_per_sec=2.0)
+        limiter.acquire()
+        limiter.acquire()
+        mock_sleep.assert_called_once_with(0.5)
+
+    @patch('farewell_claimer.time.sleep')
+    def test_backoff_halves_refill_rate(self, mock_sleep):
+        """Test that backoff slows the limiter and honors Retry-After."""
+        limiter = farewell_claimer.RateLimiter(capacity=10, refill_per_sec=10.0)
+        limiter.backoff(retry_after=3.0)
+        assert limiter.refill_per_sec == 5.0
+        mock_sleep.assert_called_once_with(3.0)
+
+    def test_throttle_errors_are_detected(self):
+        """Test that 4xx SMTP replies count as throttling and 5xx do not."""
+        assert farewell_claimer.is_throttle_error(smtplib.SMTPDataError(451, b"Slow down"))
+        assert not farewell_claimer.is_throttle_error(smtplib.SMTPDataError(550, b"Rejected"))
+        assert farewell_claimer.is_throttle_error(
+            smtplib.SMTPRecipientsRefused({"a@test.com": (452, b"Too many")})
+        )
+        assert not farewell_claimer.is_throttle_error(Exception("boom"))
 
 
 class TestSaveEml:
@@ -243,3 +905,180 @@ class TestSaveEml:
             content = f.read()
         assert "Ñoño" in content
         assert "你好" in content
+
+    def test_save_eml_writes_sent_bytes_verbatim(self, temp_output_dir):
+        """Test that raw bytes from a send are written unchanged (CRLF kept)."""
+        raw = b"Subject: T\r\n\r\nbody \xc3\xa9\r\n"
+
+        filepath = save_eml(raw, "sent.eml", temp_output_dir)
+
+        assert Path(filepath).read_bytes() == raw
+
+    @pytest.mark.skipif(os.name == 'nt', reason="POSIX permission bits")
+    def test_save_eml_is_private(self, temp_output_dir):
+        """Test that saved .eml files are readable by the owner only."""
+        filepath = save_eml("Test message", "private.eml", temp_output_dir)
+
+        assert stat.S_IMODE(os.stat(filepath).st_mode) == 0o600
+
+    def test_save_eml_handles_short_writes(self, temp_output_dir):
+        """Test that a large payload is written in full when os.write is partial."""
+        raw = b"X" * (256 * 1024)
+        real_write = os.write
+
+        def short_write(fd, data):
+            return real_write(fd, bytes(data[:10000]))
+
+        with patch('farewell_claimer.os.write', side_effect=short_write) as mock_write, \
+                patch('builtins.open') as mock_open:
+            filepath = save_eml(raw, "large.eml", temp_output_dir)
+
+        mock_open.assert_not_called()
+        assert mock_write.call_count == -(-len(raw) // 10000)
+        assert Path(filepath).read_bytes() == raw
+
+    def test_save_eml_creates_directory_once(self, tmp_path):
+        """Test that repeat saves into one directory reuse the cached mkdir."""
+        out_dir = str(tmp_path / "batch")
+        farewell_claimer._ensure_output_dir.cache_clear()
+
+        with patch.object(Path, 'mkdir', autospec=True, side_effect=Path.mkdir) as mock_mkdir:
+            for i in range(3):
+                save_eml(f"Message {i}", f"{i}.eml", out_dir)
+
+        assert mock_mkdir.call_count == 1
+        assert sorted(p.name for p in Path(out_dir).iterdir()) == ["0.eml", "1.eml", "2.eml"]
+
+    def test_save_eml_recreates_removed_directory(self, tmp_path):
+        """Test that a directory removed after caching is created again."""
+        out_dir = tmp_path / "gone"
+        save_eml("first", "a.eml", str(out_dir))
+        (out_dir / "a.eml").unlink()
+        out_dir.rmdir()
+
+        filepath = save_eml("second", "b.eml", str(out_dir))
+
+        assert Path(filepath).read_text() == "second"
+
+
+class TestNormalizeRecipients:
+    """Tests for recipient validation and deduplication."""
+
+    def test_dedupes_case_insensitively(self):
+        """Test that repeated recipients are sent to once, keeping all their indices."""
+        recipients, indices = normalize_recipients(["alice@x.com", " Alice@X.com ", "bob@y.org"])
+
+        assert recipients == ["alice@x.com", "bob@y.org"]
+        assert indices == [[0, 1], [2]]
+
+    def test_accepts_comma_separated_string(self):
+        """Test that a comma-separated string is split."""
+        recipients, indices = normalize_recipients("alice@x.com, bob@y.org,,")
+
+        assert recipients == ["alice@x.com", "bob@y.org"]
+        assert indices == [[0], [1]]
+
+    def test_drops_invalid_addresses(self):
+        """Test that malformed addresses are skipped, keeping original indices."""
+        recipients, indices = normalize_recipients(["not-an-email", "a@b", "carol@z.net"])
+
+        assert recipients == ["carol@z.net"]
+        assert indices == [[2]]
+
+    def test_loader_keeps_original_indices(self, tmp_path):
+        """Test that loaded messages carry the on-chain recipient positions."""
+        path = tmp_path / "message.json"
+        path.write_text(json.dumps({
+            "recipients": ["bob@y.org", "bob@y.org", "carol@z.net"],
+            "contentHash": "0x" + "ab" * 32,
+            "message": "Goodbye",
+        }))
+
+        msg_info = load_message_from_file(str(path))
+
+        assert msg_info["recipients"] == ["bob@y.org", "carol@z.net"]
+        assert msg_info["recipient_indices"] == [[0, 1], [2]]
+
+
+class TestNormalizeContentHash:
+    """Tests for payload content hash validation."""
+
+    @pytest.mark.parametrize("value", ["ab" * 32, "0x" + "ab" * 32, "0X" + "ab" * 32, " 0x" + "AB" * 32 + "\n"])
+    def test_accepts_32_byte_hex(self, value):
+        """Test that the prefix is optional and whitespace is trimmed."""
+        assert normalize_content_hash(value) == "0x" + value.strip()[-64:]
+
+    @pytest.mark.parametrize("value", ["", "0x", "0x1234", "0x" + "ab" * 33, "0x" + "zz" * 32, "0x" + "ab " * 21 + "a"])
+    def test_rejects_malformed_hash(self, value):
+        """Test that anything but 64 hex digits raises ValueError."""
+        with pytest.raises(ValueError):
+            normalize_content_hash(value)
+
+    def test_loader_rejects_short_hash(self, tmp_path):
+        """Test that a message file with a truncated hash is refused."""
+        path = tmp_path / "message.json"
+        path.write_text(json.dumps({
+            "recipients": ["bob@y.org"],
+            "contentHash": "0x1234",
+            "message": "Goodbye",
+        }))
+
+        assert load_message_from_file(str(path)) is None
+
+
+class TestLoadMessageJson:
+    """Tests for the JSON backends used by load_message_from_file."""
+
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_backends_parse_the_same(self, tmp_path, monkeypatch, orjson_available):
+        """Test that orjson and the stdlib fallback load identical message data."""
+        if orjson_available and not hasattr(farewell_claimer, "orjson"):
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(farewell_claimer, "ORJSON_AVAILABLE", orjson_available)
+        path = tmp_path / "message.json"
+        path.write_bytes(json.dumps({
+            "recipients": "alice@x.com, bob@y.org",
+            "content_hash": "ab" * 32,
+            "message": "Até logo 👋",
+        }, ensure_ascii=False).encode('utf-8'))
+
+        msg_info = load_message_from_file(str(path))
+
+        assert msg_info["recipients"] == ["alice@x.com", "bob@y.org"]
+        assert msg_info["content_hash"] == "0x" + "ab" * 32
+        assert msg_info["message"] == "Até logo 👋"
+
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_backends_reject_invalid_json(self, tmp_path, monkeypatch, orjson_available):
+        """Test that both backends report malformed files the same way."""
+        if orjson_available and not hasattr(farewell_claimer, "orjson"):
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(farewell_claimer, "ORJSON_AVAILABLE", orjson_available)
+        path = tmp_path / "broken.json"
+        path.write_bytes(b'{"recipients": [')
+
+        assert load_message_from_file(str(path)) is None
+
+
+class TestLoadClaimPackage:
+    """Tests for loading Farewell UI claim packages."""
+
+    def test_attaches_exported_file_verbatim(self, tmp_path):
+        """Test that the claim package is attached byte-for-byte, not re-serialized."""
+        raw = json.dumps({
+            "type": "farewell-claim-package",
+            "recipients": ["alice@x.com"],
+            "contentHash": "0x" + "cd" * 32,
+            "subject": "Adeus — até já",
+        }, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        path = tmp_path / "claim.json"
+        path.write_bytes(raw)
+
+        msg_info = load_message_from_file(str(path))
+        attachment = farewell_claimer.build_attachment_part(
+            msg_info["claim_package_json"], msg_info["claim_package_filename"]
+        )
+
+        assert msg_info["claim_package_json"] == raw
+        assert attachment.get_payload(decode=True) == raw
+        assert attachment.get_filename() == "claim.json"
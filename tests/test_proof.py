@@ -2,8 +2,10 @@
 Tests for proof generation functionality.
 """
 
+import io
 import json
 import os
+import stat
 import sys
 from pathlib import Path
 from unittest.mock import patch
@@ -187,6 +189,21 @@ class TestSaveProof:
 
         assert Path(filepath).exists()
 
+    def test_save_proof_creates_nested_directory(self, tmp_path):
+        """Test that save_proof creates missing parent directories too."""
+        filepath = save_proof({"test": "data"}, "test.json", str(tmp_path / "a" / "b"))
+
+        assert Path(filepath).exists()
+
+    def test_save_proof_uses_orjson_bytes(self, temp_output_dir):
+        """Test that with orjson installed the file is orjson's indented output."""
+        orjson = pytest.importorskip("orjson")
+        proof = {"pA": ["0x1", "0x2"], "publicSignals": ["0xa", "0xb", "0xc"]}
+
+        filepath = save_proof(proof, "orjson.json", temp_output_dir)
+
+        assert Path(filepath).read_bytes() == orjson.dumps(proof, option=orjson.OPT_INDENT_2)
+
     def test_save_proof_formatted_json(self, temp_output_dir):
         """Test that saved JSON is properly formatted (indented)."""
         proof = {"pA": ["0x1", "0x2"]}
@@ -199,6 +216,26 @@ class TestSaveProof:
         # Indented JSON should have newlines
         assert "\n" in content
 
+    @pytest.mark.skipif(os.name == 'nt', reason="POSIX permission bits")
+    def test_save_proof_is_private(self, temp_output_dir):
+        """Test that saved proofs are readable by the owner only."""
+        filepath = save_proof({"pA": ["0x1", "0x2"]}, "private.json", temp_output_dir)
+
+        assert stat.S_IMODE(os.stat(filepath).st_mode) == 0o600
+
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_save_proof_json_backends_agree(self, temp_output_dir, monkeypatch, orjson_available):
+        """Test that orjson and the stdlib fallback write the same document."""
+        if orjson_available and not hasattr(farewell_claimer, "orjson"):
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(farewell_claimer, "ORJSON_AVAILABLE", orjson_available)
+        proof = {"owner": "0xabc", "messageIndex": 2 ** 70, "pA": ["0x1", "0x2"]}
+
+        filepath = save_proof(proof, "backend.json", temp_output_dir)
+
+        with open(filepath, 'r') as f:
+            assert json.load(f) == proof
+
 
 class TestBuildDeliveryProof:
     """Tests for building the DeliveryProofJson envelope."""
@@ -438,6 +475,12 @@ class TestKeccak256Hashing:
     def test_produces_expected_keccak_vector(self):
         assert keccak256_hex(b"alice@example.com") == self.ALICE_KECCAK
 
+    def test_backend_matches_eth_utils(self):
+        """The direct eth_hash backend agrees with eth_utils.keccak."""
+        eth_utils = pytest.importorskip("eth_utils")
+        for data in (b"", b"alice@example.com", bytes(range(256)) * 4):
+            assert keccak256_hex(data) == "0x" + eth_utils.keccak(data).hex()
+
     def test_normalization_matches_site(self):
         """Upper-cased / padded input hashes the same after .lower().strip().
 
@@ -447,6 +490,17 @@ class TestKeccak256Hashing:
         normalized = "  ALICE@Example.COM  ".lower().strip()
         assert keccak256_hex(normalized.encode()) == self.ALICE_KECCAK
 
+    @pytest.mark.parametrize("email", [
+        "  ALICE@Example.COM  ",
+        "\tbob+Tag@EXAMPLE.org\n",
+        "ÄLICE@Exämple.COM",
+        "\x1calice@example.com\x1f",
+    ])
+    def test_fast_normalization_matches_str_lower(self, email):
+        """The ASCII translate fast path equals .lower().strip(), including non-ASCII."""
+        expected = email.lower().strip().encode("utf-8")
+        assert farewell_claimer._normalized_email_bytes(email) == expected
+
     def test_generate_proof_signals_0_is_keccak_not_sha3(self, sample_eml_content):
         """Regression guard against the prior SHA3-256 placeholder.
 
@@ -462,6 +516,14 @@ class TestKeccak256Hashing:
         )
         assert proof["publicSignals"][0] == self.ALICE_KECCAK
 
+    def test_recipient_hash_is_memoized(self):
+        """Repeated normalized recipients hit the cache instead of rehashing."""
+        farewell_claimer._recipient_hash.cache_clear()
+        first = farewell_claimer._recipient_hash("alice@example.com")
+        second = farewell_claimer._recipient_hash("alice@example.com")
+        assert first == second == self.ALICE_KECCAK
+        assert farewell_claimer._recipient_hash.cache_info().hits == 1
+
 
 class TestDkimExtraction:
     """The DKIM-Signature header drives publicSignals[1]."""
@@ -471,6 +533,17 @@ class TestDkimExtraction:
         assert domain == "gmail.com"
         assert selector == "20230601"
 
+    def test_accepts_raw_bytes(self, gmail_dkim_eml_content):
+        """Raw .eml bytes parse the same as the decoded text."""
+        assert extract_dkim_domain_and_selector(gmail_dkim_eml_content.encode()) == (
+            "gmail.com", "20230601",
+        )
+
+    def test_header_name_is_case_insensitive(self):
+        """A lowercase header name with CRLF folding still yields both tags."""
+        eml = b"dkim-signature: v=1; a=rsa-sha256;\r\n\td=Example.COM; s=sel1;\r\n bh=abc\r\nSubject: x\r\n\r\nbody"
+        assert extract_dkim_domain_and_selector(eml) == ("example.com", "sel1")
+
     def test_missing_dkim_returns_none(self, sample_eml_content):
         """.eml without a DKIM-Signature header yields (None, None), not an error."""
         domain, selector = extract_dkim_domain_and_selector(sample_eml_content)
@@ -501,6 +574,49 @@ class TestDkimExtraction:
         )
         assert proof["publicSignals"][1] == KNOWN_DKIM_PUBKEY_HASHES[("gmail.com", "20230601")]
 
+    @pytest.mark.parametrize("form", ["bytes", "path", "file"])
+    def test_generate_proof_accepts_eml_sources(self, gmail_dkim_eml_content, tmp_path, form):
+        """bytes, a path or a binary file give the same proof as the str content."""
+        raw = gmail_dkim_eml_content.encode("utf-8")
+        eml_path = tmp_path / "sent.eml"
+        eml_path.write_bytes(raw)
+        sources = {"bytes": lambda: raw, "path": lambda: eml_path, "file": lambda: open(eml_path, "rb")}
+
+        source = sources[form]()
+        try:
+            proof = generate_proof_data(source, "alice@example.com", "0xbeef")
+        finally:
+            if form == "file":
+                source.close()
+
+        assert proof == generate_proof_data(gmail_dkim_eml_content, "alice@example.com", "0xbeef")
+
+    def test_generate_proof_reads_only_headers(self, gmail_dkim_eml_content, monkeypatch):
+        """Standalone proofs stop reading at the end of the header block."""
+        monkeypatch.delenv("FAREWELL_PROVER_CMD", raising=False)
+        body = b"x" * (farewell_claimer.EML_READ_CHUNK * 4)
+        fp = io.BytesIO(gmail_dkim_eml_content.encode("utf-8") + body)
+
+        proof = generate_proof_data(fp, "alice@example.com", "0xbeef")
+
+        assert proof["publicSignals"][1] == KNOWN_DKIM_PUBKEY_HASHES[("gmail.com", "20230601")]
+        assert fp.tell() == farewell_claimer.EML_READ_CHUNK
+
+    def test_dkim_parse_is_shared_with_cli_summary(self, gmail_dkim_eml_content, monkeypatch):
+        """The CLI's DKIM lookup and generate_proof_data parse the headers once."""
+        monkeypatch.delenv("FAREWELL_PROVER_CMD", raising=False)
+        farewell_claimer._dkim_signal.cache_clear()
+
+        domain, selector, _ = farewell_claimer._dkim_signal(
+            farewell_claimer._eml_headers(gmail_dkim_eml_content)
+        )
+        with patch.object(farewell_claimer, "extract_dkim_domain_and_selector") as parse:
+            proof = generate_proof_data(gmail_dkim_eml_content, "alice@example.com", "0xbeef")
+
+        parse.assert_not_called()
+        assert (domain, selector) == ("gmail.com", "20230601")
+        assert proof["publicSignals"][1] == KNOWN_DKIM_PUBKEY_HASHES[("gmail.com", "20230601")]
+
 
 class TestExternalProverHook:
     """FAREWELL_PROVER_CMD env var shells out to a Groth16 prover."""
@@ -550,3 +666,17 @@ class TestExternalProverHook:
         monkeypatch.setenv("FAREWELL_PROVER_CMD", "echo not-json")
         with pytest.raises(RuntimeError, match="not JSON"):
             generate_proof_data(sample_eml_content, "a@b.com", "0x1234")
+
+    def test_prover_jobs_single_worker_without_prover(self, monkeypatch):
+        """Standalone placeholder proofs don't need a worker pool."""
+        monkeypatch.delenv("FAREWELL_PROVER_CMD", raising=False)
+        monkeypatch.setenv("FAREWELL_PROVER_JOBS", "8")
+        assert farewell_claimer._prover_jobs() == 1
+
+    @pytest.mark.parametrize("value, expected", [("3", 3), ("0", 1), ("", None), ("lots", None)])
+    def test_prover_jobs_from_env(self, monkeypatch, value, expected):
+        """FAREWELL_PROVER_JOBS sets the external prover concurrency."""
+        monkeypatch.setenv("FAREWELL_PROVER_CMD", "prove")
+        monkeypatch.setenv("FAREWELL_PROVER_JOBS", value)
+        default = min(4, os.cpu_count() or 1)
+        assert farewell_claimer._prover_jobs() == (expected or default)
@@ -2,12 +2,19 @@
 Tests for SMTP configuration and connection functionality.
 """
 
+import dataclasses
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from unittest.mock import MagicMock, patch
 import smtplib
+from datetime import datetime, timedelta, timezone
 
 import farewell_claimer
-from farewell_claimer import SMTPConfig, SMTP_PRESETS
+from farewell_claimer import SMTPConfig, SMTPPreset, SMTP_PRESETS
 
 
 class TestSMTPConfig:
@@ -52,38 +59,46 @@ class TestSMTPPresets:
         """Test Gmail preset configuration."""
         assert "gmail" in SMTP_PRESETS
         gmail = SMTP_PRESETS["gmail"]
-        assert gmail["host"] == "smtp.gmail.com"
-        assert gmail["port"] == 587
-        assert gmail["use_tls"] is True
-        assert gmail["use_ssl"] is False
+        assert gmail.host == "smtp.gmail.com"
+        assert gmail.port == 587
+        assert gmail.use_tls is True
+        assert gmail.use_ssl is False
 
     def test_outlook_preset_exists(self):
         """Test Outlook preset configuration."""
         assert "outlook" in SMTP_PRESETS
         outlook = SMTP_PRESETS["outlook"]
-        assert outlook["host"] == "smtp-mail.outlook.com"
-        assert outlook["port"] == 587
+        assert outlook.host == "smtp-mail.outlook.com"
+        assert outlook.port == 587
 
     def test_yahoo_preset_exists(self):
         """Test Yahoo preset configuration."""
         assert "yahoo" in SMTP_PRESETS
         yahoo = SMTP_PRESETS["yahoo"]
-        assert yahoo["host"] == "smtp.mail.yahoo.com"
-        assert yahoo["port"] == 587
+        assert yahoo.host == "smtp.mail.yahoo.com"
+        assert yahoo.port == 587
 
     def test_icloud_preset_exists(self):
         """Test iCloud preset configuration."""
         assert "icloud" in SMTP_PRESETS
         icloud = SMTP_PRESETS["icloud"]
-        assert icloud["host"] == "smtp.mail.me.com"
-        assert icloud["port"] == 587
+        assert icloud.host == "smtp.mail.me.com"
+        assert icloud.port == 587
 
     def test_all_presets_have_required_fields(self):
         """Test all presets have required fields."""
-        required_fields = ["host", "port", "use_tls", "use_ssl"]
         for provider, preset in SMTP_PRESETS.items():
-            for field in required_fields:
-                assert field in preset, f"{provider} missing {field}"
+            assert isinstance(preset, SMTPPreset), provider
+            assert preset.host, f"{provider} missing host"
+            assert isinstance(preset.port, int), f"{provider} missing port"
+            assert isinstance(preset.use_tls, bool) and isinstance(preset.use_ssl, bool)
+
+    def test_presets_are_read_only(self):
+        """Test that the shared preset table and its entries cannot be mutated."""
+        with pytest.raises(TypeError):
+            SMTP_PRESETS["evil"] = SMTP_PRESETS["gmail"]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            SMTP_PRESETS["gmail"].host = "smtp.evil.example"
 
 
 class TestSMTPConnection:
@@ -100,7 +115,7 @@ class TestSMTPConnection:
         assert result is True
         mock_smtp_class.assert_called_once_with(smtp_config.host, smtp_config.port, timeout=30)
         mock_smtp.ehlo.assert_called()
-        mock_smtp.starttls.assert_called_once()
+        mock_smtp.starttls.assert_called_once_with(context=farewell_claimer._ssl_context())
         mock_smtp.login.assert_called_once_with(smtp_config.email, smtp_config.password)
         mock_smtp.quit.assert_called_once()
 
@@ -113,10 +128,25 @@ class TestSMTPConnection:
         result = farewell_claimer.test_smtp_connection(smtp_config_ssl)
 
         assert result is True
-        mock_smtp_ssl_class.assert_called_once_with(smtp_config_ssl.host, smtp_config_ssl.port, timeout=30)
+        mock_smtp_ssl_class.assert_called_once_with(
+            smtp_config_ssl.host, smtp_config_ssl.port, timeout=30, context=farewell_claimer._ssl_context()
+        )
         mock_smtp.login.assert_called_once()
         mock_smtp.quit.assert_called_once()
 
+    @patch('farewell_claimer.smtplib.SMTP')
+    def test_smtp_connection_disables_nagle(self, mock_smtp_class, smtp_config):
+        """Test that the session socket gets TCP_NODELAY and reuses one TLS context."""
+        mock_smtp = MagicMock()
+        mock_smtp_class.return_value = mock_smtp
+
+        farewell_claimer.test_smtp_connection(smtp_config)
+        farewell_claimer.test_smtp_connection(smtp_config)
+
+        mock_smtp.sock.setsockopt.assert_called_with(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        contexts = {id(c.kwargs['context']) for c in mock_smtp.starttls.call_args_list}
+        assert len(contexts) == 1
+
     @patch('farewell_claimer.smtplib.SMTP')
     def test_smtp_connection_auth_failure(self, mock_smtp_class, smtp_config):
         """Test SMTP connection with authentication failure."""
@@ -145,3 +175,150 @@ class TestSMTPConnection:
         result = farewell_claimer.test_smtp_connection(smtp_config)
 
         assert result is False
+
+
+class TestOAuthTokenRefresh:
+    """Tests for proactive OAuth token refresh."""
+
+    def _now(self):
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @patch('farewell_claimer.Request')
+    def test_refreshes_token_close_to_expiry(self, mock_request, gmail_oauth_config, tmp_path, monkeypatch):
+        """Test that a token expiring within the margin is refreshed and saved."""
+        token_file = tmp_path / "token.json"
+        monkeypatch.setattr(farewell_claimer, "TOKEN_FILE", str(token_file))
+        creds = gmail_oauth_config.oauth_credentials
+        creds.expiry = self._now() + timedelta(minutes=2)
+        creds.to_json.return_value = '{"token": "fresh"}'
+
+        refreshed = farewell_claimer.refresh_oauth_token_if_needed(gmail_oauth_config)
+
+        assert refreshed is True
+        creds.refresh.assert_called_once()
+        assert token_file.read_text() == '{"token": "fresh"}'
+
+    @patch('farewell_claimer.Request')
+    def test_skips_fresh_token(self, mock_request, gmail_oauth_config):
+        """Test that a token with plenty of lifetime left is not refreshed."""
+        creds = gmail_oauth_config.oauth_credentials
+        creds.expiry = self._now() + timedelta(minutes=45)
+
+        refreshed = farewell_claimer.refresh_oauth_token_if_needed(gmail_oauth_config)
+
+        assert refreshed is False
+        creds.refresh.assert_not_called()
+
+    def test_skips_token_without_expiry(self, gmail_oauth_config):
+        """Test that credentials reporting no expiry are not refreshed on every window."""
+        creds = gmail_oauth_config.oauth_credentials
+        creds.expiry = None
+
+        assert farewell_claimer.refresh_oauth_token_if_needed(gmail_oauth_config) is False
+        creds.refresh.assert_not_called()
+
+    @patch('farewell_claimer.Request')
+    def test_refreshes_expired_token(self, mock_request, gmail_oauth_config, tmp_path, monkeypatch):
+        """Test that a token already past its expiry is refreshed."""
+        monkeypatch.setattr(farewell_claimer, "TOKEN_FILE", str(tmp_path / "token.json"))
+        creds = gmail_oauth_config.oauth_credentials
+        creds.expiry = self._now() - timedelta(minutes=1)
+        creds.to_json.return_value = '{}'
+
+        assert farewell_claimer.refresh_oauth_token_if_needed(gmail_oauth_config) is True
+        creds.refresh.assert_called_once()
+
+    def test_skips_without_refresh_token(self, gmail_oauth_config):
+        """Test that credentials without a refresh token are left alone."""
+        creds = gmail_oauth_config.oauth_credentials
+        creds.refresh_token = None
+
+        assert farewell_claimer.refresh_oauth_token_if_needed(gmail_oauth_config) is False
+        creds.refresh.assert_not_called()
+
+
+class TestOAuthRefreshBetweenWindows:
+    """Tests for refreshing the OAuth token on the main thread before each send window."""
+
+    def test_margin_covers_the_window(self, gmail_oauth_config):
+        """Test that the refresh margin adds the window's duration at the provider rate."""
+        gmail_oauth_config.rate_limit = (10, 2.0)
+        with patch.object(farewell_claimer, 'refresh_oauth_token_if_needed', return_value=False) as refresh:
+            farewell_claimer.refresh_oauth_before_window(gmail_oauth_config, 200)
+
+        refresh.assert_called_once_with(
+            gmail_oauth_config, farewell_claimer.OAUTH_REFRESH_MARGIN + timedelta(seconds=100)
+        )
+
+    def test_refresh_failure_is_reported(self, gmail_oauth_config, capsys):
+        """Test that a failed refresh prints a warning instead of being swallowed."""
+        with patch.object(farewell_claimer, 'refresh_oauth_token_if_needed', side_effect=OSError("offline")):
+            farewell_claimer.refresh_oauth_before_window(gmail_oauth_config, 1)
+
+        assert "Could not refresh OAuth token: offline" in capsys.readouterr().out
+
+
+class TestProviderMenu:
+    """Tests for the cached provider menu."""
+
+    def test_menu_is_built_once(self):
+        """Test that the provider menu is memoized across calls."""
+        farewell_claimer._provider_menu.cache_clear()
+        first = farewell_claimer._provider_menu()
+        second = farewell_claimer._provider_menu()
+        assert first is second
+        assert farewell_claimer._provider_menu.cache_info().misses == 1
+
+    def test_menu_keys_and_labels_line_up(self):
+        """Test that every provider key has a label and maps to a preset."""
+        providers, provider_names = farewell_claimer._provider_menu()
+        assert len(providers) == len(provider_names)
+        assert providers[-1] == "manual"
+        for provider in providers[:-1]:
+            assert provider in SMTP_PRESETS
+
+
+class TestLazyGoogleImport:
+    """Tests for deferring the Google client libraries until OAuth is used."""
+
+    def test_import_does_not_load_google_clients(self):
+        """Test that importing the module leaves googleapiclient unimported."""
+        code = (
+            "import sys, farewell_claimer; "
+            "sys.exit('googleapiclient.discovery' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(Path(farewell_claimer.__file__).parent),
+        )
+
+        assert result.returncode == 0
+
+    @pytest.mark.skipif(not farewell_claimer.GOOGLE_OAUTH_AVAILABLE, reason="Google libraries not installed")
+    def test_module_attribute_triggers_import(self):
+        """Test that farewell_claimer.build resolves to the googleapiclient builder."""
+        from googleapiclient.discovery import build
+
+        assert farewell_claimer.build is build
+
+
+class TestLazyOptionalImports:
+    """Tests for deferring asyncio/aiosmtplib and cryptography until they are used."""
+
+    @pytest.mark.parametrize("module", ["asyncio", "aiosmtplib", "cryptography"])
+    def test_import_does_not_load_module(self, module):
+        """Test that importing farewell_claimer leaves optional send/decrypt modules unimported."""
+        code = f"import sys, farewell_claimer; sys.exit({module!r} in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(Path(farewell_claimer.__file__).parent),
+        )
+
+        assert result.returncode == 0
+
+    @pytest.mark.skipif(not farewell_claimer.AIOSMTPLIB_AVAILABLE, reason="aiosmtplib not installed")
+    def test_module_attribute_triggers_import(self):
+        """Test that farewell_claimer.aiosmtplib resolves to the real package."""
+        import aiosmtplib
+
+        assert farewell_claimer.aiosmtplib is aiosmtplib
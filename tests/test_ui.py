@@ -2,6 +2,11 @@
 Tests for UI helper functions.
 """
 
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from unittest.mock import patch, MagicMock
 from io import StringIO
@@ -14,6 +19,9 @@ from farewell_claimer import (
     print_error,
     print_warning,
     print_info,
+    print_many,
+    print_info_many,
+    print_success_many,
     prompt,
     confirm,
     select_option,
@@ -66,6 +74,143 @@ class TestPrintFunctions:
         output = mock_stdout.getvalue()
         assert "Here's some information" in output
 
+    @pytest.mark.parametrize("emit", [print_banner, lambda: print_section("Title")])
+    def test_banner_and_section_are_one_write(self, emit):
+        """Test that multi-line banner and section headers go out in a single write."""
+        with patch('sys.stdout') as mock_stdout:
+            emit()
+
+        mock_stdout.write.assert_called_once()
+        (text,), _ = mock_stdout.write.call_args
+        assert text.count("\n") > 2
+
+    @pytest.mark.skipif(os.name == 'nt', reason="Windows output goes through colorama")
+    def test_print_banner_writes_bytes_to_descriptor(self, tmp_path, monkeypatch):
+        """Test that the banner is one os.write after any text already buffered."""
+        with open(tmp_path / "out.txt", "w", encoding="utf-8") as stream:
+            monkeypatch.setattr(sys, "stdout", stream)
+            stream.write("before\n")
+            with patch('farewell_claimer.os.write', wraps=os.write) as mock_write:
+                print_banner()
+            monkeypatch.undo()
+
+        assert mock_write.call_count == 1
+        assert (tmp_path / "out.txt").read_bytes() == b"before\n" + farewell_claimer._BANNER_BYTES
+
+    @pytest.mark.skipif(os.name == 'nt', reason="Windows output goes through colorama")
+    def test_terminal_stream_is_written_to_descriptor(self, tmp_path, monkeypatch):
+        """Test that the import-time terminal stream gets one os.write per line, in order."""
+        with open(tmp_path / "out.txt", "w", encoding="utf-8") as stream:
+            monkeypatch.setattr(sys, "stdout", stream)
+            monkeypatch.setattr(farewell_claimer, "_TTY_STREAM", stream)
+            monkeypatch.setattr(farewell_claimer, "_TTY_FD", stream.fileno())
+            stream.write("before\n")
+            with patch('farewell_claimer.os.write', wraps=os.write) as mock_write:
+                print_info("one line")
+            monkeypatch.undo()
+
+        assert mock_write.call_count == 1
+        assert (tmp_path / "out.txt").read_text(encoding="utf-8") == "before\nℹ one line\n"
+
+    @pytest.mark.parametrize("helper", [print_success, print_error, print_warning, print_info])
+    def test_status_line_is_one_write(self, helper):
+        """Test that each status helper writes its whole line in a single call."""
+        with patch('sys.stdout') as mock_stdout:
+            helper("one line")
+
+        mock_stdout.write.assert_called_once()
+        (text,), _ = mock_stdout.write.call_args
+        assert text.endswith("one line\n")
+
+    @pytest.mark.parametrize("helper, single", [
+        (print_info_many, print_info),
+        (print_success_many, print_success),
+    ])
+    def test_many_is_one_write_matching_single_lines(self, helper, single):
+        """Test that the batch helpers write N lines at once, identical to N single calls."""
+        with patch('sys.stdout', new_callable=StringIO) as expected:
+            single("first")
+            single("second")
+        with patch('sys.stdout') as mock_stdout:
+            helper(iter(["first", "second"]))
+
+        mock_stdout.write.assert_called_once_with(expected.getvalue())
+
+    @pytest.mark.parametrize("helper, level", [
+        (print_success, "success"),
+        (print_error, "error"),
+        (print_warning, "warning"),
+        (print_info, "info"),
+    ])
+    def test_helpers_use_level_table(self, helper, level):
+        """Test that each status helper emits its level's prefix from the shared table."""
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            helper("msg")
+        assert mock_stdout.getvalue() == farewell_claimer._LEVELS[level] + "msg\n"
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_print_many_by_level(self, mock_stdout):
+        """Test that print_many accepts every status level and rejects unknown ones."""
+        for level in ("success", "error", "warning", "info"):
+            print_many(level, [level])
+        assert mock_stdout.getvalue().splitlines()[-1].endswith("info")
+        with pytest.raises(KeyError):
+            print_many("debug", ["x"])
+
+    def test_piped_output_has_no_ansi_codes(self):
+        """Test that redirected output is plain text (colors resolved for a non-TTY)."""
+        code = "import farewell_claimer as fc; fc.print_success('done'); fc.print_section('S')"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(Path(farewell_claimer.__file__).parent),
+            stdout=subprocess.PIPE,
+        )
+
+        assert b"done" in result.stdout
+        assert b"\x1b[" not in result.stdout
+
+    def test_piped_output_skips_colorama_wrapper(self):
+        """Test that a non-TTY stdout is left as Python's own buffered stream."""
+        code = (
+            "import io, sys, farewell_claimer as fc; "
+            "sys.exit(not isinstance(sys.stdout, io.TextIOWrapper) or fc.Fore.GREEN != '')"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(Path(farewell_claimer.__file__).parent),
+            stdout=subprocess.PIPE,
+        )
+
+        assert result.returncode == 0
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX pty")
+    @pytest.mark.parametrize("env, colored", [
+        ({"TERM": "xterm-256color"}, True),
+        ({"TERM": "dumb"}, False),
+        ({"TERM": "xterm-256color", "NO_COLOR": "1"}, False),
+        ({"TERM": "xterm-256color", "NO_COLOR": ""}, True),
+    ])
+    def test_terminal_color_detection(self, env, colored):
+        """Test that a TTY gets colored status lines unless TERM=dumb or NO_COLOR is set."""
+        import pty
+        code = "import farewell_claimer as fc; fc.print_success('done')"
+        master, slave = pty.openpty()
+        try:
+            subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=str(Path(farewell_claimer.__file__).parent),
+                stdout=slave,
+                env={**{k: v for k, v in os.environ.items() if k != "NO_COLOR"}, **env},
+                timeout=30,
+            )
+            output = os.read(master, 65536)
+        finally:
+            os.close(master)
+            os.close(slave)
+
+        assert b"done" in output
+        assert (b"\x1b[32m" in output) is colored
+
 
 class TestPromptFunction:
     """Tests for the prompt function."""
@@ -88,6 +233,20 @@ class TestPromptFunction:
         result = prompt("Enter value", default="default_value")
         assert result == "custom"
 
+    @patch('builtins.input', return_value="")
+    def test_prompt_text_is_cached(self, mock_input):
+        """Test that repeated prompts reuse one formatted prompt string."""
+        farewell_claimer._format_prompt.cache_clear()
+        prompt("Port", default="587")
+        prompt("Port", default="587")
+        prompt("Host")
+
+        first, second, third = (c.args[0] for c in mock_input.call_args_list)
+        assert first is second
+        assert "[" in first and "587" in first
+        assert third.startswith("Host") and "[" not in third
+        assert farewell_claimer._format_prompt.cache_info().hits == 1
+
 
 class TestConfirmFunction:
     """Tests for the confirm function."""
@@ -128,6 +287,16 @@ class TestConfirmFunction:
         result = confirm("Continue?")
         assert result is True
 
+    @patch('builtins.input', return_value=" yes ")
+    def test_confirm_ignores_surrounding_whitespace(self, mock_input):
+        """Test confirm accepts a padded answer."""
+        assert confirm("Continue?", default=False) is True
+
+    @patch('builtins.input', return_value="sure")
+    def test_confirm_unknown_answer_is_no(self, mock_input):
+        """Test confirm treats an unrecognized answer as no, even with default=True."""
+        assert confirm("Continue?", default=True) is False
+
 
 class TestSelectOptionFunction:
     """Tests for the select_option function."""
@@ -175,6 +344,45 @@ class TestSelectOptionFunction:
         assert mock_input.call_count == 3
         assert result == 1
 
+    @patch('builtins.input', side_effect=["²", "-1", " 2 "])
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_select_option_non_decimal_input(self, mock_stdout, mock_input):
+        """Test that digit-like and signed input is refused and padded input accepted."""
+        result = select_option(["Option A", "Option B"])
+        assert result == 1
+        assert mock_stdout.getvalue().count("Please enter a valid number") == 2
+
+    @patch('builtins.input', return_value="1")
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_select_option_menu_layout(self, mock_stdout, mock_input):
+        """Test that options are numbered from 1, one per line, after the title."""
+        select_option(["Option A", "100% done"], "Choose one:")
+        assert mock_stdout.getvalue().startswith("Choose one:\n  1. Option A\n  2. 100% done\n")
+
+    @patch('builtins.input', return_value="300")
+    def test_select_option_long_menu_written_in_chunks(self, mock_input):
+        """Test that a long menu goes out in bounded chunks, numbered continuously."""
+        options = tuple(f"Option {i}" for i in range(1, 301))
+        with patch('sys.stdout') as mock_stdout:
+            result = select_option(options, "Choose one:")
+
+        assert result == 299
+        writes = [c.args[0] for c in mock_stdout.write.call_args_list]
+        menu = "".join(writes)
+        assert len(writes) == 2
+        assert writes[0].startswith("Choose one:\n  1. Option 1\n")
+        assert writes[1].startswith("  257. Option 257\n")
+        assert menu.count("Option ") == 300 and menu.count("Choose one:") == 1
+
+    @patch('builtins.input', side_effect=["x", "9", "2"])
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_select_option_menu_shown_once(self, mock_stdout, mock_input):
+        """Test that retries re-prompt without re-printing the menu."""
+        select_option(["Option A", "Option B"], "Choose one:")
+        output = mock_stdout.getvalue()
+        assert output.count("Choose one:") == 1
+        assert output.count("Option A") == 1
+
     @patch('builtins.input', return_value="1")
     @patch('sys.stdout', new_callable=StringIO)
     def test_select_option_displays_options(self, mock_stdout, mock_input):
@@ -203,3 +411,13 @@ class TestClearScreen:
         with patch('os.name', 'nt'):
             farewell_claimer.clear_screen()
             mock_system.assert_called_with('cls')
+
+    @patch('os.system')
+    def test_clear_screen_ansi_terminal(self, mock_system, monkeypatch):
+        """Test that ANSI terminals are cleared with an escape instead of a subprocess."""
+        monkeypatch.setattr(farewell_claimer, "_COLOR", True)
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            farewell_claimer.clear_screen()
+
+        mock_system.assert_not_called()
+        assert mock_stdout.getvalue() == "\033[2J\033[H"